@@ -16,15 +16,53 @@ Features:
 Author: SmartFlow Systems
 """
 
+import atexit
 import os
+import struct
+import threading
 import uuid
+import weakref
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Set, Tuple, Any
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 import json
 import math
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Impression/conversion counters are buffered in memory and written out in
+# batches: after this many events, or this many seconds after the first
+# unflushed event, whichever comes first
+FLUSH_EVERY_EVENTS = 100
+FLUSH_INTERVAL_SECONDS = 2.0
+
+# Flushed events are appended to <id>.log next to the <id>.json snapshot as
+# fixed-size records (event type, variant position, revenue); once the log
+# grows past LOG_COMPACT_BYTES it is folded into the snapshot and truncated
+EVENT_IMPRESSION = 0
+EVENT_CONVERSION = 1
+LOG_RECORD = struct.Struct('<BId')
+LOG_COMPACT_BYTES = 1 << 20
+
+# Live managers, flushed by one exit hook; held weakly so a discarded
+# manager can still be garbage-collected (a pending flush timer keeps a
+# manager with unflushed events alive until it has written them)
+_managers: "weakref.WeakSet[ABTestingManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_managers() -> None:
+    for manager in list(_managers):
+        manager.flush()
+
 
 class ExperimentStatus(str, Enum):
     """Experiment lifecycle states"""
@@ -47,7 +85,7 @@ class ExperimentType(str, Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+@dataclass(slots=True)
 class Variant:
     """Individual variant in an experiment"""
     id: str
@@ -60,18 +98,64 @@ class Variant:
     conversions: int = 0
     revenue: float = 0.0
 
-    # Calculated fields
-    conversion_rate: float = 0.0
-    revenue_per_visitor: float = 0.0
+    # Running mean and sum of squared deviations of revenue per conversion
+    # (Welford), so revenue variance needs no second pass over events
+    revenue_mean: float = 0.0
+    revenue_m2: float = 0.0
 
     def __post_init__(self):
-        """Calculate derived metrics"""
+        if self.conversions > 0 and not self.revenue_mean:
+            # Saved before revenue_mean was tracked
+            self.revenue_mean = self.revenue / self.conversions
+
+    def _add_conversion(self, revenue: float) -> None:
+        """Count a conversion and fold its revenue into the running stats"""
+        self.conversions += 1
+        self.revenue += revenue
+
+        delta = revenue - self.revenue_mean
+        self.revenue_mean += delta / self.conversions
+        self.revenue_m2 += delta * (revenue - self.revenue_mean)
+
+    @property
+    def conversion_rate(self) -> float:
+        """Conversions per impression, as a percentage"""
+        if self.impressions > 0:
+            return (self.conversions / self.impressions) * 100
+        return 0.0
+
+    @property
+    def revenue_per_visitor(self) -> float:
+        """Revenue per impression"""
         if self.impressions > 0:
-            self.conversion_rate = (self.conversions / self.impressions) * 100
-            self.revenue_per_visitor = self.revenue / self.impressions
+            return self.revenue / self.impressions
+        return 0.0
 
+    @property
+    def revenue_variance(self) -> float:
+        """Sample variance of revenue per conversion"""
+        if self.conversions < 2:
+            return 0.0
+        return self.revenue_m2 / (self.conversions - 1)
 
-@dataclass
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "traffic_allocation": self.traffic_allocation,
+            "impressions": self.impressions,
+            "conversions": self.conversions,
+            "revenue": self.revenue,
+            "conversion_rate": self.conversion_rate,
+            "revenue_per_visitor": self.revenue_per_visitor,
+            "revenue_mean": self.revenue_mean,
+            "revenue_m2": self.revenue_m2,
+        }
+
+
+@dataclass(slots=True)
 class Experiment:
     """A/B test experiment"""
     id: str
@@ -97,21 +181,231 @@ class Experiment:
     winner: Optional[str] = None  # Variant ID of winner
     statistical_significance: Optional[float] = None
 
+    # Position in variants by variant ID, built from variants
+    _variant_positions: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    # Last _determine_winner result and the (impressions, conversions) per
+    # variant it was computed from
+    _winner_cache_key: Optional[tuple] = field(init=False, repr=False, compare=False)
+    _winner_cache_val: Optional[tuple] = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.utcnow()
+        self._variant_positions = {v.id: i for i, v in enumerate(self.variants)}
+        self._winner_cache_key = None
+        self._winner_cache_val = None
 
-    def to_dict(self) -> Dict:
-        """Convert to dictionary for JSON serialization"""
-        data = asdict(self)
-        data['type'] = self.type.value
-        data['status'] = self.status.value
-        data['start_date'] = self.start_date.isoformat() if self.start_date else None
-        data['end_date'] = self.end_date.isoformat() if self.end_date else None
-        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+    def get_variant(self, variant_id: str) -> Optional[Variant]:
+        """Look up a variant by ID"""
+        position = self._variant_positions.get(variant_id)
+        return self.variants[position] if position is not None else None
+
+    def to_dict(self, include_variants: bool = True) -> Dict:
+        """
+        Convert to dictionary for JSON serialization
+
+        Args:
+            include_variants: Leave out "variants" when the caller builds
+                that list itself
+        """
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "type": self.type.value,
+            "status": self.status.value,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "primary_metric": self.primary_metric,
+            "minimum_sample_size": self.minimum_sample_size,
+            "confidence_level": self.confidence_level,
+            "winner": self.winner,
+            "statistical_significance": self.statistical_significance,
+        }
+        if include_variants:
+            data["variants"] = [v.to_dict() for v in self.variants]
         return data
 
 
+def _variant_from_dict(data: Dict) -> Variant:
+    """
+    Rebuild a Variant written by Variant.to_dict
+
+    Assigns the slots directly instead of going through the dataclass
+    __init__; the derived rates in the file are ignored since they are
+    properties computed from the counters.
+    """
+    variant = object.__new__(Variant)
+    variant.id = data['id']
+    variant.name = data['name']
+    variant.description = data['description']
+    variant.traffic_allocation = data['traffic_allocation']
+    variant.impressions = data.get('impressions', 0)
+    variant.conversions = data.get('conversions', 0)
+    variant.revenue = data.get('revenue', 0.0)
+    variant.revenue_m2 = data.get('revenue_m2', 0.0)
+
+    revenue_mean = data.get('revenue_mean')
+    if not revenue_mean and variant.conversions > 0:
+        # Saved before revenue_mean was tracked
+        revenue_mean = variant.revenue / variant.conversions
+    variant.revenue_mean = revenue_mean or 0.0
+
+    return variant
+
+
+def _experiment_from_dict(data: Dict) -> Experiment:
+    """Rebuild an Experiment written by Experiment.to_dict, bypassing __init__"""
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    created_at = data.get('created_at')
+
+    experiment = object.__new__(Experiment)
+    experiment.id = data['id']
+    experiment.name = data['name']
+    experiment.description = data['description']
+    experiment.type = ExperimentType(data['type'])
+    experiment.status = ExperimentStatus(data['status'])
+    experiment.variants = [_variant_from_dict(v) for v in data['variants']]
+    experiment.start_date = datetime.fromisoformat(start_date) if start_date else None
+    experiment.end_date = datetime.fromisoformat(end_date) if end_date else None
+    experiment.created_at = datetime.fromisoformat(created_at) if created_at else datetime.utcnow()
+    experiment.primary_metric = data.get('primary_metric', "conversion_rate")
+    experiment.minimum_sample_size = data.get('minimum_sample_size', 100)
+    experiment.confidence_level = data.get('confidence_level', 0.95)
+    experiment.winner = data.get('winner')
+    experiment.statistical_significance = data.get('statistical_significance')
+    experiment._variant_positions = {v.id: i for i, v in enumerate(experiment.variants)}
+    experiment._winner_cache_key = None
+    experiment._winner_cache_val = None
+    return experiment
+
+
+@lru_cache(maxsize=8192)
+def chi_squared_test(
+    conversions_a: int,
+    impressions_a: int,
+    conversions_b: int,
+    impressions_b: int
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Chi-squared test for conversion rate significance between two variants
+
+    Returns:
+        Tuple of (chi_squared_statistic, p_value)
+    """
+    return chi_squared_contingency(((conversions_a, impressions_a), (conversions_b, impressions_b)))
+
+
+@lru_cache(maxsize=8192)
+def chi_squared_contingency(
+    counts: Tuple[Tuple[int, int], ...]
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Chi-squared test of independence across any number of variants
+
+    Builds the K x 2 table of (converted, not converted) per variant and
+    compares it with the counts expected if every variant converted at the
+    pooled rate. Pure function of the counters, so repeated polls of
+    unchanged experiments are answered from the cache.
+
+    Args:
+        counts: (conversions, impressions) per variant
+
+    Returns:
+        Tuple of (chi_squared_statistic, p_value)
+    """
+    # Avoid division by zero
+    if len(counts) < 2 or any(impressions == 0 for _, impressions in counts):
+        return None, None
+
+    total_impressions = sum(impressions for _, impressions in counts)
+    total_conversions = sum(conversions for conversions, _ in counts)
+    pooled_rate = total_conversions / total_impressions
+
+    # With two columns the converted and not-converted cells of a row share
+    # the same squared deviation d = conversions - impressions * p, and their
+    # 1/expected terms add up to 1 / (impressions * p * (1 - p)), so each row
+    # contributes d^2 / impressions scaled by one common factor
+    if pooled_rate in (0.0, 1.0):
+        chi_squared = 0.0
+    else:
+        chi_squared = sum(
+            (conversions - impressions * pooled_rate) ** 2 / impressions
+            for conversions, impressions in counts
+        ) / (pooled_rate * (1 - pooled_rate))
+
+    # Degrees of freedom = (rows - 1) * (cols - 1) = K - 1
+    df = len(counts) - 1
+
+    return chi_squared, chi_squared_p_value(chi_squared, df)
+
+
+def _regularized_gamma_q(a: float, x: float) -> float:
+    """
+    Upper regularized incomplete gamma function Q(a, x)
+
+    Series expansion below x = a + 1, Lentz's continued fraction above it
+    (Numerical Recipes 6.2); both converge to double precision within a few
+    dozen terms for the degrees of freedom used here.
+    """
+    if x <= 0:
+        return 1.0
+
+    log_prefactor = a * math.log(x) - x - math.lgamma(a)
+
+    if x < a + 1:
+        term = total = 1.0 / a
+        denominator = a
+        for _ in range(500):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefactor))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        if abs(d) < tiny:
+            d = tiny
+        c = b + an / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, h * math.exp(log_prefactor))
+
+
+@lru_cache(maxsize=8192)
+def chi_squared_p_value(chi_squared: float, df: int) -> float:
+    """
+    Calculate p-value from chi-squared statistic
+
+    Exact survival function of the chi-squared distribution: erfc for one
+    degree of freedom, the regularized incomplete gamma Q(df/2, x/2) otherwise.
+    """
+    if chi_squared <= 0:
+        return 1.0
+
+    if df == 1:
+        return math.erfc(math.sqrt(chi_squared / 2.0))
+
+    return _regularized_gamma_q(df / 2.0, chi_squared / 2.0)
+
+
 class ABTestingManager:
     """
     Manages A/B testing experiments
@@ -120,6 +414,11 @@ class ABTestingManager:
     - Chi-squared test for conversion rate significance
     - Sample size calculation based on baseline conversion rate
     - Confidence intervals for conversion rates
+
+    Experiments are cached in memory once loaded. Lifecycle changes are
+    written through immediately as a JSON snapshot; impression/conversion
+    events are buffered and appended to a per-experiment log on the next
+    flush(), and replayed on top of the snapshot when loaded.
     """
 
     def __init__(self, storage_path: str = "data/experiments"):
@@ -132,6 +431,24 @@ class ABTestingManager:
         self.storage_path = storage_path
         os.makedirs(storage_path, exist_ok=True)
 
+        self._cache: Dict[str, Experiment] = {}
+        self._results_cache: Dict[str, Tuple[tuple, Dict[str, Any]]] = {}
+        self._list_cache: Optional[List[Tuple[str, str, str]]] = None
+        self._list_cache_mtime = 0
+        self._dirty: Set[str] = set()
+        self._pending: Dict[str, bytearray] = defaultdict(bytearray)
+        self._pending_events = 0
+        self._flush_timer: Optional[threading.Timer] = None
+
+        # _lock guards the cache, dirty set and flush timer. Each experiment
+        # also has a lock for its counters and pending records, held only
+        # for in-memory updates, and an I/O lock that orders its file writes.
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._io_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+        _managers.add(self)
+
     def create_experiment(
         self,
         name: str,
@@ -167,19 +484,21 @@ class ABTestingManager:
             traffic_allocation = [1.0 / num_variants] * num_variants
 
         # Validate traffic allocation
-        if abs(sum(traffic_allocation) - 1.0) > 0.001:
-            raise ValueError(f"Traffic allocation must sum to 1.0, got {sum(traffic_allocation)}")
+        total_allocation = math.fsum(traffic_allocation)
+        if abs(total_allocation - 1.0) > 0.001:
+            raise ValueError(f"Traffic allocation must sum to 1.0, got {total_allocation}")
 
         # Create variants
-        variants = []
-        for i, (name, desc, allocation) in enumerate(zip(variant_names, variant_descriptions, traffic_allocation)):
-            variant = Variant(
+        variants = [
+            Variant(
                 id=f"variant_{i}",
-                name=name,
-                description=desc,
+                name=variant_name,
+                description=variant_description,
                 traffic_allocation=allocation
             )
-            variants.append(variant)
+            for i, (variant_name, variant_description, allocation)
+            in enumerate(zip(variant_names, variant_descriptions, traffic_allocation))
+        ]
 
         # Create experiment
         experiment = Experiment(
@@ -230,14 +549,16 @@ class ABTestingManager:
     def record_impression(self, experiment_id: str, variant_id: str) -> None:
         """Record that a visitor saw a variant"""
         experiment = self._load_experiment(experiment_id)
+        position = experiment._variant_positions.get(variant_id)
+        if position is None:
+            return
 
-        for variant in experiment.variants:
-            if variant.id == variant_id:
-                variant.impressions += 1
-                variant.__post_init__()  # Recalculate metrics
-                break
+        with self._locks[experiment_id]:
+            experiment.variants[position].impressions += 1
+            self._pending[experiment_id] += LOG_RECORD.pack(EVENT_IMPRESSION, position, 0.0)
 
-        self._save_experiment(experiment)
+        if self._mark_dirty(experiment_id):
+            self.flush()
 
     def record_conversion(
         self,
@@ -254,15 +575,33 @@ class ABTestingManager:
             revenue: Optional revenue amount
         """
         experiment = self._load_experiment(experiment_id)
-
-        for variant in experiment.variants:
-            if variant.id == variant_id:
-                variant.conversions += 1
-                variant.revenue += revenue
-                variant.__post_init__()  # Recalculate metrics
-                break
-
-        self._save_experiment(experiment)
+        position = experiment._variant_positions.get(variant_id)
+        if position is None:
+            return
+
+        with self._locks[experiment_id]:
+            experiment.variants[position]._add_conversion(revenue)
+            self._pending[experiment_id] += LOG_RECORD.pack(EVENT_CONVERSION, position, revenue)
+
+        if self._mark_dirty(experiment_id):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write experiments with buffered counter updates to storage"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            dirty, self._dirty = self._dirty, set()
+            self._pending_events = 0
+
+        for experiment_id in dirty:
+            self._flush_experiment(experiment_id)
+
+    def close(self) -> None:
+        """Flush buffered counters and stop flushing this manager at exit"""
+        self.flush()
+        _managers.discard(self)
 
     def get_experiment(self, experiment_id: str) -> Experiment:
         """Get experiment by ID"""
@@ -281,20 +620,43 @@ class ABTestingManager:
         Returns:
             List of experiments
         """
+        # Files are only ever added, replaced or removed, all of which bump
+        # the directory mtime, so the scanned headers are reused until it moves
+        mtime = os.stat(self.storage_path).st_mtime_ns
+        with self._lock:
+            headers = self._list_cache if mtime == self._list_cache_mtime else None
+
+        if headers is None:
+            headers = []
+
+            for filename in os.listdir(self.storage_path):
+                if filename.endswith('.json'):
+                    try:
+                        headers.append(self._read_experiment_header(filename[:-5]))
+                    except Exception:
+                        continue
+
+            # Sort by created date (newest first); isoformat() strings order
+            # the same way as the datetimes they encode
+            headers.sort(reverse=True)
+
+            with self._lock:
+                self._list_cache = headers
+                self._list_cache_mtime = mtime
+
+        # Only experiments that pass the filter are fully loaded
         experiments = []
-
-        for filename in os.listdir(self.storage_path):
-            if filename.endswith('.json'):
-                experiment_id = filename[:-5]
+        for _, experiment_id, saved_status in headers:
+            experiment = self._cache.get(experiment_id)
+            current_status = experiment.status if experiment is not None else saved_status
+            if status is not None and current_status != status:
+                continue
+            if experiment is None:
                 try:
                     experiment = self._load_experiment(experiment_id)
-                    if status is None or experiment.status == status:
-                        experiments.append(experiment)
                 except Exception:
                     continue
-
-        # Sort by created date (newest first)
-        experiments.sort(key=lambda x: x.created_at, reverse=True)
+            experiments.append(experiment)
 
         return experiments
 
@@ -308,157 +670,135 @@ class ABTestingManager:
             - Statistical significance
             - Confidence intervals
             - Recommendations
+
+            The dict is shared between calls until the experiment changes,
+            so treat it as read-only.
         """
         experiment = self._load_experiment(experiment_id)
 
+        # Reuse the last results while nothing they depend on has moved
+        cache_key = (
+            experiment.status,
+            experiment.start_date,
+            experiment.end_date,
+            experiment.winner,
+            tuple((v.impressions, v.conversions, v.revenue) for v in experiment.variants),
+        )
+        cached = self._results_cache.get(experiment_id)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
         # Calculate statistical significance
-        winner_id, significance = self._determine_winner(experiment)
+        sample_size_met = self._sample_size_met(experiment)
+        winner_id, significance = self._determine_winner(experiment, sample_size_met)
+
+        # Build results, serializing the variants once for both entries
+        variants_data = [v.to_dict() for v in experiment.variants]
+        experiment_data = experiment.to_dict(include_variants=False)
+        experiment_data["variants"] = variants_data
 
-        # Build results
         results = {
-            "experiment": experiment.to_dict(),
-            "variants": [asdict(v) for v in experiment.variants],
+            "experiment": experiment_data,
+            "variants": variants_data,
             "winner": winner_id,
             "statistical_significance": significance,
             "is_significant": significance is not None and significance >= experiment.confidence_level,
-            "sample_size_met": all(v.impressions >= experiment.minimum_sample_size for v in experiment.variants),
-            "recommendations": self._generate_recommendations(experiment, winner_id, significance)
+            "sample_size_met": sample_size_met,
+            "recommendations": self._generate_recommendations(experiment, winner_id, significance, sample_size_met)
         }
 
+        self._results_cache[experiment_id] = (cache_key, results)
         return results
 
-    def _determine_winner(self, experiment: Experiment) -> Tuple[Optional[str], Optional[float]]:
+    def _sample_size_met(self, experiment: Experiment) -> bool:
+        """Whether every variant has reached the minimum sample size"""
+        minimum = experiment.minimum_sample_size
+        return all(v.impressions >= minimum for v in experiment.variants)
+
+    def _determine_winner(
+        self,
+        experiment: Experiment,
+        sample_size_met: Optional[bool] = None
+    ) -> Tuple[Optional[str], Optional[float]]:
         """
-        Determine winner using chi-squared test
+        Determine winner using a chi-squared test across all variants
+
+        Args:
+            experiment: Experiment to analyse
+            sample_size_met: Precomputed _sample_size_met() result, if the
+                caller already has it
 
         Returns:
             Tuple of (winner_variant_id, significance_level)
         """
+        # Nothing to redo if no event has been recorded since the last call
+        cache_key = tuple((v.impressions, v.conversions) for v in experiment.variants)
+        if cache_key == experiment._winner_cache_key:
+            return experiment._winner_cache_val
+
+        result = self._compute_winner(experiment, sample_size_met)
+        experiment._winner_cache_key = cache_key
+        experiment._winner_cache_val = result
+        return result
+
+    def _compute_winner(
+        self,
+        experiment: Experiment,
+        sample_size_met: Optional[bool]
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Chi-squared analysis behind _determine_winner"""
         # Need at least 2 variants
         if len(experiment.variants) < 2:
             return None, None
 
         # Check if minimum sample size is met
-        if not all(v.impressions >= experiment.minimum_sample_size for v in experiment.variants):
+        if sample_size_met is None:
+            sample_size_met = self._sample_size_met(experiment)
+        if not sample_size_met:
             return None, None
 
-        # For simplicity, compare first two variants using chi-squared test
-        # In production, you'd use more sophisticated multi-variant testing
-        variant_a = experiment.variants[0]
-        variant_b = experiment.variants[1]
-
-        # Calculate chi-squared statistic
-        chi_squared, p_value = self._chi_squared_test(
-            variant_a.conversions,
-            variant_a.impressions,
-            variant_b.conversions,
-            variant_b.impressions
+        # Chi-squared test across all variants at once
+        chi_squared, p_value = chi_squared_contingency(
+            tuple((v.conversions, v.impressions) for v in experiment.variants)
         )
 
-        # Determine winner (higher conversion rate)
-        if variant_a.conversion_rate > variant_b.conversion_rate:
-            winner_id = variant_a.id
-        else:
-            winner_id = variant_b.id
+        # Determine winner (highest conversion rate)
+        winner_id = max(experiment.variants, key=lambda v: v.conversion_rate).id
 
         # Convert p-value to confidence level
         confidence = 1 - p_value if p_value is not None else None
 
         return winner_id, confidence
 
-    def _chi_squared_test(
-        self,
-        conversions_a: int,
-        impressions_a: int,
-        conversions_b: int,
-        impressions_b: int
-    ) -> Tuple[Optional[float], Optional[float]]:
-        """
-        Chi-squared test for conversion rate significance
-
-        Returns:
-            Tuple of (chi_squared_statistic, p_value)
-        """
-        # Avoid division by zero
-        if impressions_a == 0 or impressions_b == 0:
-            return None, None
-
-        # Observed values
-        obs_conv_a = conversions_a
-        obs_no_conv_a = impressions_a - conversions_a
-        obs_conv_b = conversions_b
-        obs_no_conv_b = impressions_b - conversions_b
-
-        # Total
-        total_conversions = obs_conv_a + obs_conv_b
-        total_no_conversions = obs_no_conv_a + obs_no_conv_b
-        total_impressions = impressions_a + impressions_b
-
-        if total_impressions == 0:
-            return None, None
-
-        # Expected values
-        exp_conv_a = (impressions_a * total_conversions) / total_impressions
-        exp_no_conv_a = (impressions_a * total_no_conversions) / total_impressions
-        exp_conv_b = (impressions_b * total_conversions) / total_impressions
-        exp_no_conv_b = (impressions_b * total_no_conversions) / total_impressions
-
-        # Chi-squared statistic
-        chi_squared = 0.0
-
-        if exp_conv_a > 0:
-            chi_squared += ((obs_conv_a - exp_conv_a) ** 2) / exp_conv_a
-        if exp_no_conv_a > 0:
-            chi_squared += ((obs_no_conv_a - exp_no_conv_a) ** 2) / exp_no_conv_a
-        if exp_conv_b > 0:
-            chi_squared += ((obs_conv_b - exp_conv_b) ** 2) / exp_conv_b
-        if exp_no_conv_b > 0:
-            chi_squared += ((obs_no_conv_b - exp_no_conv_b) ** 2) / exp_no_conv_b
-
-        # Degrees of freedom = (rows - 1) * (cols - 1) = 1 for 2x2 table
-        df = 1
-
-        # Calculate p-value from chi-squared distribution
-        # Using approximation for p-value
-        p_value = self._chi_squared_p_value(chi_squared, df)
-
-        return chi_squared, p_value
-
-    def _chi_squared_p_value(self, chi_squared: float, df: int) -> float:
-        """
-        Calculate p-value from chi-squared statistic
-
-        This is a simplified approximation. In production, use scipy.stats.chi2.sf()
-        """
-        # For df=1, use lookup table approximation
-        if df == 1:
-            if chi_squared >= 10.83:
-                return 0.001  # p < 0.001 (99.9% confidence)
-            elif chi_squared >= 7.88:
-                return 0.005  # p < 0.005 (99.5% confidence)
-            elif chi_squared >= 6.63:
-                return 0.01   # p < 0.01 (99% confidence)
-            elif chi_squared >= 3.84:
-                return 0.05   # p < 0.05 (95% confidence)
-            elif chi_squared >= 2.71:
-                return 0.10   # p < 0.10 (90% confidence)
-            else:
-                return 0.50   # Not significant
-
-        # Default
-        return 0.50
-
     def _generate_recommendations(
         self,
         experiment: Experiment,
         winner_id: Optional[str],
-        significance: Optional[float]
+        significance: Optional[float],
+        sample_size_met: Optional[bool] = None
     ) -> List[str]:
         """Generate actionable recommendations based on results"""
         recommendations = []
 
+        # Gather every per-variant figure used below in one pass
+        minimum = experiment.minimum_sample_size
+        all_sampled = True
+        has_revenue = False
+        best_revenue_variant = None
+        best_revenue_per_visitor = 0.0
+        for v in experiment.variants:
+            if v.impressions < minimum:
+                all_sampled = False
+            if v.revenue > 0:
+                has_revenue = True
+            revenue_per_visitor = v.revenue_per_visitor
+            if best_revenue_variant is None or revenue_per_visitor > best_revenue_per_visitor:
+                best_revenue_variant = v
+                best_revenue_per_visitor = revenue_per_visitor
+
         # Check sample size
-        sample_size_met = all(v.impressions >= experiment.minimum_sample_size for v in experiment.variants)
+        if sample_size_met is None:
+            sample_size_met = all_sampled
 
         if not sample_size_met:
             recommendations.append(
@@ -471,7 +811,7 @@ class ABTestingManager:
         is_significant = significance is not None and significance >= experiment.confidence_level
 
         if is_significant and winner_id:
-            winner = next((v for v in experiment.variants if v.id == winner_id), None)
+            winner = experiment.get_variant(winner_id)
             if winner:
                 recommendations.append(
                     f"✅ {winner.name} is the clear winner with {significance*100:.1f}% confidence. "
@@ -496,48 +836,189 @@ class ABTestingManager:
             )
 
         # Revenue insights
-        if any(v.revenue > 0 for v in experiment.variants):
-            best_revenue_variant = max(experiment.variants, key=lambda v: v.revenue_per_visitor)
+        if has_revenue:
             recommendations.append(
                 f"💰 {best_revenue_variant.name} has the highest revenue per visitor "
-                f"(${best_revenue_variant.revenue_per_visitor:.2f})"
+                f"(${best_revenue_per_visitor:.2f})"
             )
 
         return recommendations
 
+    def _mark_dirty(self, experiment_id: str) -> bool:
+        """
+        Queue an experiment with a new pending record for the next flush
+
+        Returns:
+            True if enough events are buffered that the caller should flush now
+        """
+        with self._lock:
+            self._dirty.add(experiment_id)
+            self._pending_events += 1
+
+            if self._pending_events >= FLUSH_EVERY_EVENTS:
+                return True
+
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_INTERVAL_SECONDS, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        return False
+
     def _save_experiment(self, experiment: Experiment) -> None:
-        """Save experiment to storage"""
-        filepath = os.path.join(self.storage_path, f"{experiment.id}.json")
+        """Save experiment to storage and cache"""
+        with self._lock:
+            if experiment.id not in self._cache:
+                # New file; don't rely on mtime granularity to notice it
+                self._list_cache = None
+            self._cache[experiment.id] = experiment
+
+        with self._io_locks[experiment.id]:
+            with self._locks[experiment.id]:
+                data = experiment.to_dict()
+                # The snapshot already includes any buffered events
+                self._pending.pop(experiment.id, None)
+            self._write_snapshot(experiment.id, data, self._log_size(experiment.id))
+
+    def _flush_experiment(self, experiment_id: str) -> None:
+        """Append an experiment's buffered event records to its log"""
+        with self._io_locks[experiment_id]:
+            with self._locks[experiment_id]:
+                events = self._pending.pop(experiment_id, None)
+            if not events:
+                return
+
+            log_path = self._log_path(experiment_id)
+            log_size = self._append_log(log_path, events)
+
+            if log_size >= LOG_COMPACT_BYTES:
+                # Take the snapshot together with whatever was buffered since
+                # the append, so it covers exactly the log once those are
+                # appended too
+                with self._locks[experiment_id]:
+                    data = self._cache[experiment_id].to_dict()
+                    events = self._pending.pop(experiment_id, None)
+                if events:
+                    log_size = self._append_log(log_path, events)
+
+                # Snapshot everything the log holds, then empty it. A crash
+                # before the second write leaves a log shorter than the
+                # recorded offset, which _read_experiment repairs.
+                self._write_snapshot(experiment_id, data, log_size)
+                os.truncate(log_path, 0)
+                self._write_snapshot(experiment_id, data, 0)
+
+    def _append_log(self, log_path: str, events: bytes) -> int:
+        """Append records to an event log, returning its new size"""
+        with open(log_path, 'ab') as f:
+            f.write(events)
+            return f.tell()
+
+    def _write_snapshot(self, experiment_id: str, data: Dict, log_offset: int) -> None:
+        """
+        Write experiment JSON to storage (caller holds the experiment's I/O lock)
 
-        with open(filepath, 'w') as f:
-            json.dump(experiment.to_dict(), f, indent=2)
+        Args:
+            experiment_id: Experiment ID
+            data: Experiment.to_dict() taken under the experiment's lock
+            log_offset: Size of the event log the snapshot already accounts for
+        """
+        filepath = os.path.join(self.storage_path, f"{experiment_id}.json")
+
+        data['log_offset'] = log_offset
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(data)
+        else:
+            payload = json.dumps(data, separators=(',', ':')).encode()
+
+        # Write a sibling file and rename it over the old one so readers never
+        # see a half-written experiment
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, filepath)
 
     def _load_experiment(self, experiment_id: str) -> Experiment:
-        """Load experiment from storage"""
+        """Load experiment from cache, falling back to storage"""
+        with self._lock:
+            experiment = self._cache.get(experiment_id)
+            if experiment is None:
+                experiment = self._read_experiment(experiment_id)
+                self._cache[experiment_id] = experiment
+            return experiment
+
+    def _read_experiment(self, experiment_id: str) -> Experiment:
+        """Read experiment from storage"""
+        data = self._read_json(experiment_id)
+        experiment = _experiment_from_dict(data)
+        log_offset = data.get('log_offset', 0)
+
+        if log_offset > self._log_size(experiment_id):
+            # Compaction emptied the log but stopped before recording offset
+            # 0. The snapshot covers the old log; anything in the log now was
+            # appended after the truncation, so replay it all and fix the
+            # offset before further appends make it ambiguous
+            with self._io_locks[experiment_id]:
+                self._write_snapshot(experiment_id, data, 0)
+            log_offset = 0
+
+        self._replay_log(experiment, log_offset)
+        return experiment
+
+    def _read_experiment_header(self, experiment_id: str) -> Tuple[str, str, str]:
+        """
+        Read only what list_experiments sorts and filters on
+
+        Returns:
+            Tuple of (created_at ISO string, experiment_id, status value)
+        """
+        data = self._read_json(experiment_id)
+        return data.get('created_at') or '', data['id'], data['status']
+
+    def _read_json(self, experiment_id: str) -> Dict:
+        """Parse an experiment snapshot file"""
         filepath = os.path.join(self.storage_path, f"{experiment_id}.json")
 
         if not os.path.exists(filepath):
             raise ValueError(f"Experiment {experiment_id} not found")
 
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-
-        # Convert dates back from ISO format
-        if data.get('start_date'):
-            data['start_date'] = datetime.fromisoformat(data['start_date'])
-        if data.get('end_date'):
-            data['end_date'] = datetime.fromisoformat(data['end_date'])
-        if data.get('created_at'):
-            data['created_at'] = datetime.fromisoformat(data['created_at'])
-
-        # Convert enums
-        data['type'] = ExperimentType(data['type'])
-        data['status'] = ExperimentStatus(data['status'])
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+    def _replay_log(self, experiment: Experiment, log_offset: int) -> None:
+        """Apply event log records written after the snapshot"""
+        log_path = self._log_path(experiment.id)
+
+        try:
+            with open(log_path, 'rb') as f:
+                f.seek(log_offset)
+                raw = f.read()
+        except FileNotFoundError:
+            return
+
+        # Drop a record torn by a crash mid-append so later appends stay aligned
+        usable = len(raw) - len(raw) % LOG_RECORD.size
+        if usable < len(raw):
+            os.truncate(log_path, log_offset + usable)
+
+        variants = experiment.variants
+        for event, position, revenue in LOG_RECORD.iter_unpack(raw[:usable]):
+            if position >= len(variants):
+                continue
+            if event == EVENT_IMPRESSION:
+                variants[position].impressions += 1
+            else:
+                variants[position]._add_conversion(revenue)
 
-        # Convert variants
-        data['variants'] = [Variant(**v) for v in data['variants']]
+    def _log_path(self, experiment_id: str) -> str:
+        return os.path.join(self.storage_path, f"{experiment_id}.log")
 
-        return Experiment(**data)
+    def _log_size(self, experiment_id: str) -> int:
+        try:
+            return os.path.getsize(self._log_path(experiment_id))
+        except FileNotFoundError:
+            return 0
 
 
 # Singleton instance
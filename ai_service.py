@@ -4,9 +4,19 @@ Handles AI-powered content generation using OpenAI and Anthropic Claude
 """
 
 import os
+import re
+import json
+import asyncio
+import contextlib
+import hashlib
 import logging
-from typing import List, Dict, Optional, Literal
-from dataclasses import dataclass
+import threading
+from collections import defaultdict, deque
+from types import MappingProxyType
+from typing import List, Dict, Optional, Literal, Final, Mapping, Tuple, AsyncIterator
+from dataclasses import dataclass, asdict
+
+from cache import get_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +35,115 @@ except ImportError:
     ANTHROPIC_AVAILABLE = False
     logger.warning("Anthropic SDK not installed. Install with: pip install anthropic")
 
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+# Accepted values for generate_social_posts(); checked by set membership per call
+SUPPORTED_PLATFORMS = frozenset({'Instagram', 'Twitter', 'LinkedIn', 'Facebook', 'TikTok'})
+SUPPORTED_TONES = frozenset({'Professional', 'Casual', 'Funny', 'Inspirational', 'Educational'})
+
+# Read-only: shared by every request
+PLATFORM_GUIDELINES: Final[Mapping[str, Mapping]] = MappingProxyType({
+    'Instagram': MappingProxyType({
+        'max_chars': 2200,
+        'hashtag_count': 8,
+        'style': 'Visual storytelling, engaging captions with emojis, encourage comments'
+    }),
+    'Twitter': MappingProxyType({
+        'max_chars': 280,
+        'hashtag_count': 3,
+        'style': 'Concise, punchy, conversational, thread-friendly'
+    }),
+    'LinkedIn': MappingProxyType({
+        'max_chars': 3000,
+        'hashtag_count': 5,
+        'style': 'Professional, thought leadership, insights and value-driven'
+    }),
+    'Facebook': MappingProxyType({
+        'max_chars': 1000,
+        'hashtag_count': 5,
+        'style': 'Conversational, community-focused, storytelling'
+    }),
+    'TikTok': MappingProxyType({
+        'max_chars': 300,
+        'hashtag_count': 6,
+        'style': 'Trendy, attention-grabbing, hook in first line'
+    })
+})
+
+# Instructions shared by every social post request; the chosen platform's
+# guidelines go in the per-request prompt. At a few hundred tokens this is
+# below the providers' minimum cacheable prefix, so it is not marked for caching.
+SOCIAL_POST_SYSTEM_PROMPT = """You are an expert social media content creator.
+
+For each variation:
+1. Write an engaging caption that follows the platform's best practices
+2. Include appropriate emojis (but don't overdo it)
+3. Add a call-to-action when relevant
+4. Generate the requested number of relevant hashtags for the niche
+
+Format your response as JSON with this exact structure:
+{
+  "posts": [
+    {
+      "caption": "The post caption here...",
+      "hashtags": ["#Hashtag1", "#Hashtag2", "#Hashtag3"]
+    }
+  ]
+}
+
+Make each variation unique in approach but equally engaging. Variation 1 should be the most creative, variation 2 more straightforward, variation 3 somewhere in between.
+
+IMPORTANT: Respond ONLY with valid JSON, no additional text."""
+
+# Structured output schema for OpenAI; strict mode guarantees every response
+# has exactly this shape, so it is parsed without defensive fallbacks
+POSTS_SCHEMA = {
+    "name": "posts",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "posts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "caption": {"type": "string"},
+                        "hashtags": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["caption", "hashtags"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["posts"],
+        "additionalProperties": False
+    }
+}
+
+# Hashtags for mock posts, by niche
+HASHTAG_SETS: Final[Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    'Tech & SaaS': ('#SaaS', '#TechStartup', '#B2B', '#ProductLaunch', '#Innovation', '#TechNews', '#Startup', '#DigitalTransformation'),
+    'E-commerce': ('#Ecommerce', '#OnlineShopping', '#Retail', '#ShopSmall', '#OnlineBusiness', '#DropShipping', '#EcommerceTips'),
+    'Fitness & Wellness': ('#Fitness', '#Wellness', '#HealthyLiving', '#WorkoutMotivation', '#FitnessGoals', '#HealthyLifestyle'),
+    'Finance & Investing': ('#Finance', '#Investing', '#PersonalFinance', '#WealthBuilding', '#FinancialFreedom', '#MoneyTips'),
+    'Food & Beverage': ('#Foodie', '#FoodPhotography', '#Cooking', '#FoodLovers', '#Delicious', '#FoodBlogger'),
+    'Fashion & Beauty': ('#Fashion', '#Beauty', '#Style', '#OOTD', '#BeautyBlogger', '#FashionInspo'),
+    'Real Estate': ('#RealEstate', '#Property', '#HomeForSale', '#RealEstateInvesting', '#DreamHome'),
+    'Marketing & Advertising': ('#Marketing', '#DigitalMarketing', '#GrowthHacking', '#ContentMarketing', '#MarketingTips'),
+    'Travel & Lifestyle': ('#Travel', '#Wanderlust', '#TravelBlogger', '#Lifestyle', '#Adventure', '#TravelPhotography'),
+    'Education & Coaching': ('#Education', '#Learning', '#Coaching', '#PersonalDevelopment', '#SelfImprovement')
+})
+
+# Provider requests in flight at once for generate_social_posts_many(); keep
+# within the account's rate limit tier
+AI_MAX_CONCURRENCY = int(os.environ.get("AI_MAX_CONCURRENCY", "5"))
+
 
 @dataclass
 class GeneratedPost:
@@ -35,6 +154,149 @@ class GeneratedPost:
     variation_number: int
 
 
+# Generated posts are reused for repeat requests for a day
+POST_CACHE_TTL_SECONDS = 24 * 60 * 60
+# Cosine similarity at which a differently worded topic counts as the same request
+POST_CACHE_SIMILARITY = 0.93
+POST_CACHE_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class SemanticCache:
+    """
+    Cache of generated posts keyed by the normalized request
+
+    Repeats that differ only in case, whitespace or trailing punctuation are
+    served from the shared cache. With sentence-transformers installed, a topic whose
+    embedding is close enough to a recent request for the same platform, tone,
+    niche and count is served too; anything below the threshold goes to the model.
+    """
+
+    def __init__(
+        self,
+        ttl: int = POST_CACHE_TTL_SECONDS,
+        threshold: float = POST_CACHE_SIMILARITY,
+        max_candidates: int = 256
+    ):
+        self.ttl = ttl
+        self.threshold = threshold
+        self._model = None
+        # Recent (embedding, cache key) pairs per request bucket, in this process
+        self._candidates: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_candidates))
+        self._lock = threading.Lock()
+
+    def get(self, topic: str, niche: str, platform: str, tone: str,
+            num_variations: int) -> Optional[List[GeneratedPost]]:
+        """Cached posts for this request, or None"""
+        bucket = self._bucket(niche, platform, tone, num_variations)
+        topic = self._normalize(topic)
+        cache = get_cache()
+
+        data = cache.get(self._key(bucket, topic))
+        if data is None and SENTENCE_TRANSFORMERS_AVAILABLE:
+            key = self._nearest(bucket, topic)
+            if key:
+                data = cache.get(key)
+
+        if data is None:
+            return None
+        return [GeneratedPost(**post) for post in data]
+
+    def set(self, topic: str, niche: str, platform: str, tone: str,
+            num_variations: int, posts: List[GeneratedPost]) -> None:
+        """Store posts generated for this request"""
+        bucket = self._bucket(niche, platform, tone, num_variations)
+        topic = self._normalize(topic)
+        key = self._key(bucket, topic)
+
+        get_cache().set(key, [asdict(post) for post in posts], expire=self.ttl)
+
+        if SENTENCE_TRANSFORMERS_AVAILABLE:
+            vector = self._embed(topic)
+            with self._lock:
+                self._candidates[bucket].append((vector, key))
+
+    def _nearest(self, bucket: str, topic: str) -> Optional[str]:
+        """Cache key of the most similar recent topic above the threshold"""
+        with self._lock:
+            candidates = list(self._candidates.get(bucket, ()))
+        if not candidates:
+            return None
+
+        vector = self._embed(topic)
+        best_key, best_score = None, self.threshold
+        for other, key in candidates:
+            score = sum(a * b for a, b in zip(vector, other))
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _embed(self, text: str) -> List[float]:
+        """Unit-length embedding, so a dot product is the cosine similarity"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = SentenceTransformer(POST_CACHE_EMBEDDING_MODEL)
+        return self._model.encode(text, normalize_embeddings=True).tolist()
+
+    @staticmethod
+    def _bucket(niche: str, platform: str, tone: str, num_variations: int) -> str:
+        return f"{platform}|{tone}|{niche.strip().lower()}|{num_variations}"
+
+    @staticmethod
+    def _normalize(topic: str) -> str:
+        # Inner punctuation is meaningful ("50% off", "C++"); leave near
+        # matches to the embedding lookup
+        return " ".join(topic.lower().split()).rstrip(".!?")
+
+    @staticmethod
+    def _key(bucket: str, topic: str) -> str:
+        return "ai_posts:" + hashlib.sha256(f"{bucket}|{topic}".encode()).hexdigest()
+
+
+class _PostsStreamParser:
+    """
+    Pulls complete items out of a streamed {"posts": [...]} response
+
+    Text is fed as it arrives; each feed() returns the post objects that
+    finished in it. Only the tail after the last complete item is re-parsed,
+    and only once a closing brace has arrived.
+    """
+
+    _ARRAY_START = re.compile(r'"posts"\s*:\s*\[')
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = None  # Index just past the last complete item, once the array is found
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> List[Dict]:
+        self._buffer += text
+
+        if self._pos is None:
+            match = self._ARRAY_START.search(self._buffer)
+            if not match:
+                return []
+            self._pos = match.end()
+        elif '}' not in text:
+            return []
+
+        items = []
+        buffer = self._buffer
+        while True:
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer) or buffer[pos] != '{':
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Item still incomplete
+            items.append(item)
+            self._pos = end
+        return items
+
+
 class AIContentGenerator:
     """
     Unified AI content generator supporting multiple providers
@@ -59,6 +321,8 @@ class AIContentGenerator:
         else:
             self.anthropic_client = None
 
+        self.post_cache = SemanticCache()
+
     def is_available(self) -> bool:
         """Check if any AI provider is available"""
         return self.openai_client is not None or self.anthropic_client is not None
@@ -83,72 +347,226 @@ class AIContentGenerator:
 
         Returns:
             List of GeneratedPost objects
+
+        Raises:
+            ValueError: If platform or tone is not supported
         """
 
+        self._check_supported(platform, tone)
+
         # If no AI provider available, return mock data
-        if not self.is_available():
+        provider = self._select_provider()
+        if provider is None:
             logger.warning("No AI provider available, using fallback mock data")
             return self._generate_mock_posts(topic, niche, platform, tone, num_variations)
 
+        cached = self.post_cache.get(topic, niche, platform, tone, num_variations)
+        if cached is not None:
+            logger.info(f"Serving {len(cached)} cached posts for {platform}")
+            return cached
+
         # Build the prompt
         prompt = self._build_prompt(topic, niche, platform, tone, num_variations)
 
-        # Try preferred provider first, then fallback
         try:
-            if self.preferred_provider == "anthropic" and self.anthropic_client:
-                return self._generate_with_anthropic(prompt, platform, num_variations)
-            elif self.preferred_provider == "openai" and self.openai_client:
-                return self._generate_with_openai(prompt, platform, num_variations)
+            if provider == "anthropic":
+                posts = self._generate_with_anthropic(prompt, platform, num_variations)
             else:
-                # Fallback to any available provider
-                if self.anthropic_client:
-                    return self._generate_with_anthropic(prompt, platform, num_variations)
-                elif self.openai_client:
-                    return self._generate_with_openai(prompt, platform, num_variations)
+                posts = self._generate_with_openai(prompt, platform, num_variations)
         except Exception as e:
             logger.error(f"AI generation failed: {e}", exc_info=True)
             # Fallback to mock data on error
             return self._generate_mock_posts(topic, niche, platform, tone, num_variations)
 
-        # Final fallback
-        return self._generate_mock_posts(topic, niche, platform, tone, num_variations)
+        self.post_cache.set(topic, niche, platform, tone, num_variations, posts)
+        return posts
 
-    def _build_prompt(self, topic: str, niche: str, platform: str, tone: str, num_variations: int) -> str:
-        """Build the AI prompt for post generation"""
-
-        platform_guidelines = {
-            'Instagram': {
-                'max_chars': 2200,
-                'hashtag_count': 8,
-                'style': 'Visual storytelling, engaging captions with emojis, encourage comments'
-            },
-            'Twitter': {
-                'max_chars': 280,
-                'hashtag_count': 3,
-                'style': 'Concise, punchy, conversational, thread-friendly'
-            },
-            'LinkedIn': {
-                'max_chars': 3000,
-                'hashtag_count': 5,
-                'style': 'Professional, thought leadership, insights and value-driven'
-            },
-            'Facebook': {
-                'max_chars': 1000,
-                'hashtag_count': 5,
-                'style': 'Conversational, community-focused, storytelling'
-            },
-            'TikTok': {
-                'max_chars': 300,
-                'hashtag_count': 6,
-                'style': 'Trendy, attention-grabbing, hook in first line'
-            }
-        }
+    async def generate_social_posts_many(
+        self,
+        jobs: List[Dict],
+        max_concurrency: int = AI_MAX_CONCURRENCY
+    ) -> List[List[GeneratedPost]]:
+        """
+        Generate posts for several requests concurrently
+
+        Args:
+            jobs: generate_social_posts() keyword arguments, one dict per request
+            max_concurrency: Maximum provider requests in flight at once
+
+        Returns:
+            One list of GeneratedPost objects per job, in job order
 
-        guidelines = platform_guidelines.get(platform, platform_guidelines['Instagram'])
+        Raises:
+            ValueError: If any job's platform or tone is not supported
 
-        prompt = f"""You are an expert social media content creator specializing in the {niche} industry.
+        Usage (from sync code such as a Flask view):
+            results = asyncio.run(generator.generate_social_posts_many(jobs))
+        """
+        for job in jobs:
+            self._check_supported(job['platform'], job['tone'])
+
+        provider = self._select_provider()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Async clients hold connections bound to the running event loop, so
+        # each batch opens its own rather than sharing one across asyncio.run calls
+        async with self._async_client(provider) as client:
+            async def run(job: Dict) -> List[GeneratedPost]:
+                async with semaphore:
+                    return await self._agenerate_social_posts(client, provider, **job)
+
+            return list(await asyncio.gather(*(run(job) for job in jobs)))
 
-Create {num_variations} unique social media posts for {platform} about the following topic:
+    async def generate_social_posts_stream(
+        self,
+        topic: str,
+        niche: str,
+        platform: Literal['Instagram', 'Twitter', 'LinkedIn', 'Facebook', 'TikTok'],
+        tone: Literal['Professional', 'Casual', 'Funny', 'Inspirational', 'Educational'],
+        num_variations: int = 3
+    ) -> AsyncIterator[GeneratedPost]:
+        """
+        Generate social media posts, yielding each one as soon as it is complete
+
+        Takes the same arguments as generate_social_posts(). The provider
+        response is streamed and parsed incrementally, so the first post is
+        available long before the whole response has arrived.
+
+        Raises:
+            ValueError: If platform or tone is not supported
+        """
+        self._check_supported(platform, tone)
+
+        provider = self._select_provider()
+        cached = None
+        if provider is not None:
+            cached = await asyncio.to_thread(
+                self.post_cache.get, topic, niche, platform, tone, num_variations)
+        if provider is None or cached is not None:
+            posts = cached or self._generate_mock_posts(topic, niche, platform, tone, num_variations)
+            for post in posts:
+                yield post
+            return
+
+        prompt = self._build_prompt(topic, niche, platform, tone, num_variations)
+        parser = _PostsStreamParser()
+        posts = []
+
+        try:
+            # aclosing: breaking out early closes the provider stream here, while
+            # the client is still open, not whenever the generator is collected
+            async with self._async_client(provider) as client, \
+                    contextlib.aclosing(self._stream_text(client, provider, prompt)) as chunks:
+                async for text in chunks:
+                    for post_data in parser.feed(text):
+                        if len(posts) == num_variations:
+                            break
+                        post = GeneratedPost(
+                            caption=post_data['caption'],
+                            hashtags=post_data['hashtags'],
+                            platform=platform,
+                            variation_number=len(posts) + 1
+                        )
+                        posts.append(post)
+                        yield post
+                    if len(posts) == num_variations:
+                        break
+        except Exception as e:
+            logger.error(f"AI streaming generation failed: {e}", exc_info=True)
+            if not posts:
+                for post in self._generate_mock_posts(topic, niche, platform, tone, num_variations):
+                    yield post
+            return
+
+        logger.info(f"Streamed {len(posts)} posts using {provider}")
+        if posts:
+            await asyncio.to_thread(
+                self.post_cache.set, topic, niche, platform, tone, num_variations, posts)
+
+    async def _stream_text(self, client, provider: str, prompt: str) -> AsyncIterator[str]:
+        """Response text from provider as it arrives"""
+        if provider == "anthropic":
+            async with client.messages.stream(**self._anthropic_request(prompt)) as stream:
+                async for text in stream.text_stream:
+                    yield text
+            return
+
+        stream = await client.chat.completions.create(**self._openai_request(prompt), stream=True)
+        async with stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def _check_supported(self, platform: str, tone: str) -> None:
+        """Raise ValueError for a platform or tone outside the supported set"""
+        if platform not in SUPPORTED_PLATFORMS:
+            raise ValueError(f"Unsupported platform: {platform}")
+        if tone not in SUPPORTED_TONES:
+            raise ValueError(f"Unsupported tone: {tone}")
+
+    def _select_provider(self) -> Optional[str]:
+        """Preferred provider if configured, else any available one, else None"""
+        if self.preferred_provider == "anthropic" and self.anthropic_client:
+            return "anthropic"
+        if self.preferred_provider == "openai" and self.openai_client:
+            return "openai"
+        if self.anthropic_client:
+            return "anthropic"
+        if self.openai_client:
+            return "openai"
+        return None
+
+    def _async_client(self, provider: Optional[str]):
+        """Async SDK client for provider, usable with `async with`"""
+        if provider == "anthropic":
+            return anthropic.AsyncAnthropic(api_key=self.anthropic_api_key)
+        if provider == "openai":
+            return openai.AsyncOpenAI(api_key=self.openai_api_key)
+        return contextlib.nullcontext()
+
+    async def _agenerate_social_posts(
+        self,
+        client,
+        provider: Optional[str],
+        topic: str,
+        niche: str,
+        platform: str,
+        tone: str,
+        num_variations: int = 3
+    ) -> List[GeneratedPost]:
+        """Async counterpart of generate_social_posts() on an open client"""
+        if client is None:
+            return self._generate_mock_posts(topic, niche, platform, tone, num_variations)
+
+        # Cache lookups block on Redis and, with embeddings, on the model
+        cached = await asyncio.to_thread(
+            self.post_cache.get, topic, niche, platform, tone, num_variations)
+        if cached is not None:
+            return cached
+
+        prompt = self._build_prompt(topic, niche, platform, tone, num_variations)
+
+        try:
+            if provider == "anthropic":
+                message = await client.messages.create(**self._anthropic_request(prompt))
+                posts = self._posts_from_anthropic(message, platform, num_variations)
+            else:
+                response = await client.chat.completions.create(**self._openai_request(prompt))
+                posts = self._posts_from_openai(response, platform, num_variations)
+        except Exception as e:
+            logger.error(f"AI generation failed: {e}", exc_info=True)
+            return self._generate_mock_posts(topic, niche, platform, tone, num_variations)
+
+        await asyncio.to_thread(
+            self.post_cache.set, topic, niche, platform, tone, num_variations, posts)
+        return posts
+
+    def _build_prompt(self, topic: str, niche: str, platform: str, tone: str, num_variations: int) -> str:
+        """Build the per-request part of the prompt; shared instructions are in SOCIAL_POST_SYSTEM_PROMPT"""
+
+        guidelines = PLATFORM_GUIDELINES.get(platform, PLATFORM_GUIDELINES['Instagram'])
+
+        prompt = f"""Create {num_variations} unique social media posts for {platform} about the following topic:
 "{topic}"
 
 Requirements:
@@ -157,59 +575,15 @@ Requirements:
 - Style: {guidelines['style']}
 - Maximum characters: {guidelines['max_chars']}
 - Number of hashtags: {guidelines['hashtag_count']}
-- Niche: {niche}
-
-For each variation:
-1. Write an engaging caption that follows {platform}'s best practices
-2. Include appropriate emojis (but don't overdo it)
-3. Add a call-to-action when relevant
-4. Generate {guidelines['hashtag_count']} relevant hashtags for the {niche} niche
-
-Format your response as JSON with this exact structure:
-{{
-  "posts": [
-    {{
-      "caption": "The post caption here...",
-      "hashtags": ["#Hashtag1", "#Hashtag2", "#Hashtag3"]
-    }}
-  ]
-}}
-
-Make each variation unique in approach but equally engaging. Variation 1 should be the most creative, variation 2 more straightforward, variation 3 somewhere in between.
-
-IMPORTANT: Respond ONLY with valid JSON, no additional text."""
+- Niche: {niche} (write as a specialist in the {niche} industry)"""
 
         return prompt
 
     def _generate_with_anthropic(self, prompt: str, platform: str, num_variations: int) -> List[GeneratedPost]:
         """Generate using Anthropic Claude"""
         try:
-            message = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-5-20250929",  # Latest Claude model
-                max_tokens=2000,
-                temperature=0.8,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
-
-            # Extract JSON from response
-            response_text = message.content[0].text
-            import json
-            data = json.loads(response_text)
-
-            posts = []
-            for idx, post_data in enumerate(data.get('posts', [])[:num_variations]):
-                posts.append(GeneratedPost(
-                    caption=post_data['caption'],
-                    hashtags=post_data['hashtags'],
-                    platform=platform,
-                    variation_number=idx + 1
-                ))
-
-            logger.info(f"Generated {len(posts)} posts using Anthropic Claude")
-            return posts
+            message = self.anthropic_client.messages.create(**self._anthropic_request(prompt))
+            return self._posts_from_anthropic(message, platform, num_variations)
 
         except Exception as e:
             logger.error(f"Anthropic generation error: {e}", exc_info=True)
@@ -218,39 +592,70 @@ IMPORTANT: Respond ONLY with valid JSON, no additional text."""
     def _generate_with_openai(self, prompt: str, platform: str, num_variations: int) -> List[GeneratedPost]:
         """Generate using OpenAI GPT"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",  # Latest GPT-4 model
-                messages=[{
-                    "role": "system",
-                    "content": "You are an expert social media content creator. Always respond with valid JSON only."
-                }, {
-                    "role": "user",
-                    "content": prompt
-                }],
-                temperature=0.8,
-                max_tokens=2000,
-                response_format={"type": "json_object"}  # Force JSON mode
-            )
-
-            import json
-            data = json.loads(response.choices[0].message.content)
-
-            posts = []
-            for idx, post_data in enumerate(data.get('posts', [])[:num_variations]):
-                posts.append(GeneratedPost(
-                    caption=post_data['caption'],
-                    hashtags=post_data['hashtags'],
-                    platform=platform,
-                    variation_number=idx + 1
-                ))
-
-            logger.info(f"Generated {len(posts)} posts using OpenAI GPT-4")
-            return posts
+            response = self.openai_client.chat.completions.create(**self._openai_request(prompt))
+            return self._posts_from_openai(response, platform, num_variations)
 
         except Exception as e:
             logger.error(f"OpenAI generation error: {e}", exc_info=True)
             raise
 
+    def _anthropic_request(self, prompt: str) -> Dict:
+        """messages.create() arguments for a social post prompt"""
+        return dict(
+            model="claude-sonnet-4-5-20250929",  # Latest Claude model
+            max_tokens=2000,
+            temperature=0.8,
+            system=SOCIAL_POST_SYSTEM_PROMPT,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }]
+        )
+
+    def _openai_request(self, prompt: str) -> Dict:
+        """chat.completions.create() arguments for a social post prompt"""
+        return dict(
+            model="gpt-4o",  # Latest GPT-4 model
+            messages=[{
+                "role": "system",
+                "content": SOCIAL_POST_SYSTEM_PROMPT
+            }, {
+                "role": "user",
+                "content": prompt
+            }],
+            temperature=0.8,
+            max_tokens=2000,
+            response_format={"type": "json_schema", "json_schema": POSTS_SCHEMA}
+        )
+
+    def _posts_from_anthropic(self, message, platform: str, num_variations: int) -> List[GeneratedPost]:
+        """Parse a Claude response into posts"""
+        data = json.loads(message.content[0].text)
+        posts = self._parse_posts(data.get('posts', []), platform, num_variations)
+
+        logger.info(f"Generated {len(posts)} posts using Anthropic Claude")
+        return posts
+
+    def _posts_from_openai(self, response, platform: str, num_variations: int) -> List[GeneratedPost]:
+        """Parse a GPT response into posts"""
+        data = json.loads(response.choices[0].message.content)
+        posts = self._parse_posts(data['posts'], platform, num_variations)
+
+        logger.info(f"Generated {len(posts)} posts using OpenAI GPT-4")
+        return posts
+
+    def _parse_posts(self, post_items: List[Dict], platform: str, num_variations: int) -> List[GeneratedPost]:
+        """Turn the "posts" items of a JSON response into GeneratedPost objects"""
+        posts = []
+        for idx, post_data in enumerate(post_items[:num_variations]):
+            posts.append(GeneratedPost(
+                caption=post_data['caption'],
+                hashtags=post_data['hashtags'],
+                platform=platform,
+                variation_number=idx + 1
+            ))
+        return posts
+
     def _generate_mock_posts(
         self,
         topic: str,
@@ -261,22 +666,9 @@ IMPORTANT: Respond ONLY with valid JSON, no additional text."""
     ) -> List[GeneratedPost]:
         """Fallback mock post generation"""
 
-        hashtag_sets = {
-            'Tech & SaaS': ['#SaaS', '#TechStartup', '#B2B', '#ProductLaunch', '#Innovation', '#TechNews', '#Startup', '#DigitalTransformation'],
-            'E-commerce': ['#Ecommerce', '#OnlineShopping', '#Retail', '#ShopSmall', '#OnlineBusiness', '#DropShipping', '#EcommerceTips'],
-            'Fitness & Wellness': ['#Fitness', '#Wellness', '#HealthyLiving', '#WorkoutMotivation', '#FitnessGoals', '#HealthyLifestyle'],
-            'Finance & Investing': ['#Finance', '#Investing', '#PersonalFinance', '#WealthBuilding', '#FinancialFreedom', '#MoneyTips'],
-            'Food & Beverage': ['#Foodie', '#FoodPhotography', '#Cooking', '#FoodLovers', '#Delicious', '#FoodBlogger'],
-            'Fashion & Beauty': ['#Fashion', '#Beauty', '#Style', '#OOTD', '#BeautyBlogger', '#FashionInspo'],
-            'Real Estate': ['#RealEstate', '#Property', '#HomeForSale', '#RealEstateInvesting', '#DreamHome'],
-            'Marketing & Advertising': ['#Marketing', '#DigitalMarketing', '#GrowthHacking', '#ContentMarketing', '#MarketingTips'],
-            'Travel & Lifestyle': ['#Travel', '#Wanderlust', '#TravelBlogger', '#Lifestyle', '#Adventure', '#TravelPhotography'],
-            'Education & Coaching': ['#Education', '#Learning', '#Coaching', '#PersonalDevelopment', '#SelfImprovement'],
-        }
-
-        base_hashtags = hashtag_sets.get(niche, hashtag_sets['Tech & SaaS'])
+        base_hashtags = HASHTAG_SETS.get(niche, HASHTAG_SETS['Tech & SaaS'])
         hashtag_count = 3 if platform == 'Twitter' else 8 if platform == 'Instagram' else 5
-        hashtags = base_hashtags[:hashtag_count]
+        hashtags = list(base_hashtags[:hashtag_count])
 
         posts = []
 
@@ -362,7 +754,6 @@ IMPORTANT: Respond ONLY with valid JSON."""
                     temperature=0.7,
                     messages=[{"role": "user", "content": prompt}]
                 )
-                import json
                 return json.loads(message.content[0].text)
             elif self.openai_client:
                 response = self.openai_client.chat.completions.create(
@@ -374,7 +765,6 @@ IMPORTANT: Respond ONLY with valid JSON."""
                     temperature=0.7,
                     response_format={"type": "json_object"}
                 )
-                import json
                 return json.loads(response.choices[0].message.content)
         except Exception as e:
             logger.error(f"Email generation error: {e}", exc_info=True)
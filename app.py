@@ -1,30 +1,79 @@
 import os
-import json
 import uuid
+import atexit
 import logging
-from datetime import datetime, timedelta
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session
-from sqlalchemy import and_
+import queue
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from datetime import datetime, timedelta, timezone
+from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session, g, has_app_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import and_, or_, func, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased, joinedload, raiseload, make_transient_to_detached
 from werkzeug.middleware.proxy_fix import ProxyFix
-from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 import stripe
+from apscheduler.schedulers import SchedulerNotRunningError
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from config import Config, FEATURES_BY_PLAN, PLAN_DETAILS
+from config import Config, FEATURES_BY_PLAN, PLAN_DETAILS, PRICE_IDS
 from database import db
+from cache import get_cache
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from flask_session import Session
+    FLASK_SESSION_AVAILABLE = True
+except ImportError:
+    FLASK_SESSION_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize responses with orjson; naive datetimes are emitted as UTC with a Z suffix"""
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype)
 
 # Create the app
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 app.config["SFS_BUILD"]=__import__("time").strftime("%Y-%m-%d %H:%M:%S")
-app.config["TEMPLATES_AUTO_RELOAD"]=True
-try:
-    app.jinja_env.cache={}
-except Exception:
-    pass
+# Template reloading stats and recompiles on every render; only worth it in dev
+if Config.DEBUG:
+    app.config["TEMPLATES_AUTO_RELOAD"]=True
+    try:
+        app.jinja_env.cache={}
+    except Exception:
+        pass
 app.secret_key = os.environ.get("SESSION_SECRET", "fallback-secret")
+
+# Keep sessions server-side in Redis when Flask-Session and a reachable Redis
+# are both present; otherwise fall back to Flask's signed cookie sessions
+if FLASK_SESSION_AVAILABLE and get_cache().redis_client is not None:
+    app.config["SESSION_TYPE"] = "redis"
+    app.config["SESSION_REDIS"] = get_cache().redis_client
+    app.config["SESSION_KEY_PREFIX"] = "sfs:session:"
+    Session(app)
+
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 # Configure the database
@@ -36,90 +85,255 @@ db.init_app(app)
 
 # Initialize Stripe
 stripe.api_key = Config.STRIPE_SECRET_KEY
+# One shared client: its per-thread requests.Session keeps the TLS connection
+# to api.stripe.com alive between calls
+try:
+    stripe.default_http_client = stripe.RequestsClient()
+except Exception as e:
+    logging.warning(f"Stripe requests client unavailable, using SDK default: {e}")
 
-# Token serializer for invitations
-signer = URLSafeTimedSerializer(app.secret_key)
-
-with app.app_context():
-    # Import models to ensure tables are created
-    from models import Tenant, User, Membership, Invitation, AuditLog, NotificationSettings, Booking, ReminderLog
-    # SFS: moved to init_db(); was: db.create_all()
+# Models only depend on database.db, so they can be imported at module
+# scope; tables are created in init_db()
+from models import Tenant, User, Membership, Invitation, AuditLog, NotificationSettings, Booking, ReminderLog
 
 # Import utilities
-from onboarding import send_email_smtp, onboarding_email
+from onboarding import send_email_smtp, send_twilio_message, onboarding_email
 from stripe_utils import create_checkout_session
 
 # Helper functions
+# Timestamps are stored as naive UTC throughout
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def to_naive_utc(dt: datetime) -> datetime:
+    """Normalise an aware datetime to naive UTC; naive values are assumed UTC"""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+# Session user/tenant rows are cached so most requests skip both SELECTs
+SESSION_ROW_TTL = 300
+
+def _cached_row(model, prefix: str, pk):
+    """Load a row by primary key through the shared cache"""
+    if not pk:
+        return None
+    data = get_cache().get(f"{prefix}:{pk}")
+    if data is None:
+        obj = db.session.get(model, pk)
+        if obj is not None:
+            get_cache().set(f"{prefix}:{pk}",
+                            {c.key: getattr(obj, c.key) for c in model.__table__.columns},
+                            expire=SESSION_ROW_TTL)
+        return obj
+    # Re-attach the cached column values without a round-trip
+    obj = model(**data)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+def invalidate_cached_rows(user_id=None, tenant_id=None):
+    cache = get_cache()
+    if has_app_context():
+        # Drop the per-request copy too so the rest of this request sees the change
+        g.pop('_current_user', None)
+    if user_id:
+        cache.delete(f"sfs:user:{user_id}")
+    if tenant_id:
+        cache.delete(f"sfs:tenant:{tenant_id}")
+
 def get_current_user():
-    """For demo purposes, create/return a default user and tenant"""
-    from models import User, Tenant, Membership
+    """Return the (user, tenant) pair for this request, resolved at most once"""
+    if '_current_user' not in g:
+        g._current_user = _load_current_user()
+    return g._current_user
+
+DEMO_EMAIL = "demo@smartflowsystems.com"
+# Filled in by ensure_demo_seed() so cold sessions need no lookup
+DEMO_USER_ID = None
+DEMO_TENANT_ID = None
+
+def ensure_demo_seed():
+    """Create the demo user, tenant and owner membership if missing; return (user, tenant)"""
+    global DEMO_USER_ID, DEMO_TENANT_ID
+    u = User.query.filter_by(email=DEMO_EMAIL).first()
+    if not u:
+        u = User(id=str(uuid.uuid4()), email=DEMO_EMAIL, name="Demo User")  # type: ignore
+        db.session.add(u)
+        db.session.commit()
+    
+    t = Tenant.query.filter_by(owner_user_id=u.id).first()
+    if not t:
+        t = Tenant(id=str(uuid.uuid4()), name="Demo Workspace", owner_user_id=u.id, plan="starter")  # type: ignore
+        db.session.add(t)
+        db.session.commit()
+        
+        now = utcnow()
+        m = Membership(tenant_id=t.id, user_id=u.id, role="owner",  # type: ignore
+                      invited_at=now, activated_at=now)
+        db.session.add(m)
+        db.session.commit()
+        invalidate_seat_count(t.id)
+    
+    DEMO_USER_ID, DEMO_TENANT_ID = u.id, t.id
+    return u, t
+
+def _load_current_user():
+    """For demo purposes, return the session's user and tenant, defaulting to the demo seed"""
     user_id = session.get('user_id')
     if not user_id:
-        # Create demo user if none exists
-        u = User.query.filter_by(email="demo@smartflowsystems.com").first()
-        if not u:
-            u = User(id=str(uuid.uuid4()), email="demo@smartflowsystems.com", name="Demo User")  # type: ignore
-            db.session.add(u)
-            db.session.commit()
-        
-        t = Tenant.query.filter_by(owner_user_id=u.id).first()
-        if not t:
-            t = Tenant(id=str(uuid.uuid4()), name="Demo Workspace", owner_user_id=u.id, plan="starter")  # type: ignore
-            db.session.add(t)
-            db.session.commit()
-            
-            m = Membership(tenant_id=t.id, user_id=u.id, role="owner",  # type: ignore
-                          invited_at=datetime.utcnow(), activated_at=datetime.utcnow())
-            db.session.add(m)
-            db.session.commit()
-        
+        if DEMO_USER_ID:
+            session['user_id'] = DEMO_USER_ID
+            session['tenant_id'] = DEMO_TENANT_ID
+            return _load_current_user()
+        # init_db() has not seeded this process yet
+        u, t = ensure_demo_seed()
         session['user_id'] = u.id
         session['tenant_id'] = t.id
         return u, t
     else:
-        u = User.query.get(user_id)
-        t = Tenant.query.get(session.get('tenant_id'))
+        u = _cached_row(User, "sfs:user", user_id)
+        t = _cached_row(Tenant, "sfs:tenant", session.get('tenant_id'))
         if u and t:
             return u, t
         # Fallback to demo user if session data is invalid
-        return get_current_user() if user_id else (None, None)
+        session.pop('user_id', None)
+        session.pop('tenant_id', None)
+        if user_id == DEMO_USER_ID:
+            # The seed itself is gone; recreate it rather than loop
+            ensure_demo_seed()
+        return _load_current_user()
+
+_SEAT_LIMITS = {"starter": 2, "flowkit": 5, "launchpack": 15}
+_SEAT_DEFAULT = 2
+FEATURES_BY_PLAN_SETS = {p: frozenset(f) for p, f in FEATURES_BY_PLAN.items()}
+_NO_FEATURES = frozenset()
 
+# Both lookups are a single dict probe; an lru_cache wrapper would only add
+# argument hashing and a second probe on top
 def seat_limit_for_plan(plan: str) -> int:
-    return {"starter": 2, "flowkit": 5, "launchpack": 15}.get(plan, 2)
-
-def tenant_active_seats(tenant_id: str) -> int:
-    from models import Membership
-    return Membership.query.filter_by(tenant_id=tenant_id).count()
-
-def log_action(tenant_id, actor_user_id, action, target_type, target_id, metadata=None):
-    from models import AuditLog
-    rec = AuditLog(tenant_id=tenant_id, actor_user_id=actor_user_id, action=action,  # type: ignore
-                   target_type=target_type, target_id=target_id,
-                   event_data=json.dumps(metadata or {}))
-    db.session.add(rec)
-    db.session.commit()
+    return _SEAT_LIMITS.get(plan, _SEAT_DEFAULT)
+
+def seat_limit_reached(tenant_id: str, limit: int) -> bool:
+    """Whether the tenant has `limit` or more members. Uses the exact count
+    cached by /admin; on a miss this reads at most `limit` keys from the
+    membership primary key instead of counting all"""
+    seats = get_cache().get(f"sfs:seats:{tenant_id}")
+    if seats is None:
+        seats = (db.session.query(Membership.user_id)
+                 .filter(Membership.tenant_id==tenant_id)
+                 .limit(limit)
+                 .count())
+    return seats >= limit
+
+def invalidate_seat_count(tenant_id: str):
+    get_cache().delete(f"sfs:seats:{tenant_id}")
+
+# Audit rows are written behind the request and flushed in batches by the
+# scheduler; pass in_transaction=True where the row must commit with the caller
+_audit_queue = queue.SimpleQueue()
+AUDIT_FLUSH_BATCH = 500
+# A failed batch is kept and retried on each following flush (one per second)
+# before it is given up on
+AUDIT_FLUSH_RETRIES = 60
+_audit_retry = []
+_audit_failures = 0
+_audit_flush_lock = threading.Lock()
+
+def log_action(tenant_id, actor_user_id, action, target_type, target_id, metadata=None, in_transaction=False):
+    """Record an audit event.
+
+    Events are queued and written in batches by the audit_flush_1s job. With
+    in_transaction the row is added to the current session instead, so it is
+    committed atomically by the caller's own commit.
+    """
+    rec = {"tenant_id": tenant_id, "actor_user_id": actor_user_id, "action": action,
+           "target_type": target_type, "target_id": target_id,
+           "event_data": metadata or None,
+           "created_at": utcnow()}
+    if in_transaction:
+        db.session.add(AuditLog(**rec))  # type: ignore
+    else:
+        _audit_queue.put(rec)
+
+def _flush_audit_log():
+    """Drain queued audit rows into audit_logs.
+
+    A batch that fails to insert is put back and retried first on the next
+    flush; rows are only dropped after AUDIT_FLUSH_RETRIES failures in a row.
+    """
+    global _audit_retry, _audit_failures
+    with _audit_flush_lock, app.app_context():
+        while True:
+            batch, _audit_retry = _audit_retry, []
+            try:
+                while len(batch) < AUDIT_FLUSH_BATCH:
+                    batch.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                return
+            try:
+                db.session.execute(AuditLog.__table__.insert(), batch)
+                db.session.commit()
+                _audit_failures = 0
+            except Exception as e:
+                db.session.rollback()
+                _audit_failures += 1
+                if _audit_failures >= AUDIT_FLUSH_RETRIES:
+                    logging.error(f"Audit log flush failed {_audit_failures} times, dropped {len(batch)} rows: {e}")
+                    _audit_failures = 0
+                else:
+                    logging.warning(f"Audit log flush failed, retrying {len(batch)} rows: {e}")
+                    _audit_retry = batch
+                return
 
 def has_feature_access(plan: str, feature: str) -> bool:
-    return feature in FEATURES_BY_PLAN.get(plan, [])
+    return feature in FEATURES_BY_PLAN_SETS.get(plan, _NO_FEATURES)
+
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
 
 def get_or_create_notif_settings(tenant_id: str):
-    from models import NotificationSettings
-    s = NotificationSettings.query.get(tenant_id)
+    s = db.session.get(NotificationSettings, tenant_id)
     if not s:
-        s = NotificationSettings(tenant_id=tenant_id)  # type: ignore
-        db.session.add(s)
+        # INSERT ... ON CONFLICT DO NOTHING so concurrent callers can't race
+        # each other into an IntegrityError on the tenant_id primary key
+        insert_fn = _UPSERT_INSERTS.get(db.engine.dialect.name)
+        if insert_fn:
+            db.session.execute(insert_fn(NotificationSettings)
+                               .values(tenant_id=tenant_id)
+                               .on_conflict_do_nothing(index_elements=["tenant_id"]))
+        else:
+            db.session.merge(NotificationSettings(tenant_id=tenant_id))  # type: ignore
         db.session.commit()
+        s = db.session.get(NotificationSettings, tenant_id)
     return s
 
-def notif_ok(tenant_id: str, channel: str) -> bool:
-    s = get_or_create_notif_settings(tenant_id)
+# Twilio credentials come from the environment and don't change at runtime
+TWILIO_CONFIGURED = bool(Config.TWILIO_ACCOUNT_SID and Config.TWILIO_AUTH_TOKEN and Config.TWILIO_PHONE_NUMBER)
+
+def _channel_enabled(s, channel: str) -> bool:
+    """Channel check against a settings row; None means the model defaults"""
     if channel == "email":
-        return bool(s.email_enabled)
+        return bool(s.email_enabled) if s else True
     if channel == "sms":
-        has_keys = bool(Config.TWILIO_ACCOUNT_SID and Config.TWILIO_AUTH_TOKEN and Config.TWILIO_PHONE_NUMBER)
-        return bool(s.sms_enabled and has_keys)
+        return bool(TWILIO_CONFIGURED and s and s.sms_enabled)
     return False
 
+def notif_ok(tenant_id: str, channel: str) -> bool:
+    return _channel_enabled(get_or_create_notif_settings(tenant_id), channel)
+
+def run_in_background(func, *args, job_id=None):
+    """Queue a one-shot job on the scheduler, running inline if it isn't running or queueing fails"""
+    if not scheduler.running:
+        # add_job() on a stopped scheduler just stores the job
+        func(*args)
+        return
+    try:
+        scheduler.add_job(func, args=list(args), id=job_id, replace_existing=job_id is not None)
+    except Exception as e:
+        logging.error(f"Could not queue {func.__name__}, running inline: {e}")
+        func(*args)
+
 # Routes
 @app.route("/")
 def home():
@@ -139,8 +353,7 @@ def checkout():
         return redirect(url_for('pricing'))
     
     # Get the appropriate price ID from config
-    price_id_key = f"STRIPE_PRICE_{plan.upper()}_{mode.upper()}"
-    price_id = getattr(Config, price_id_key, None)
+    price_id = PRICE_IDS.get((plan, mode))
     
     if not price_id:
         flash("Payment configuration not found", "error")
@@ -183,30 +396,10 @@ def checkout():
 def success():
     session_id = request.args.get('session_id')
     if session_id:
-        try:
-            checkout_session = stripe.checkout.Session.retrieve(session_id)
-            plan = checkout_session.metadata.get('plan', 'starter') if checkout_session.metadata else 'starter'
-            
-            # Update tenant plan
-            user, tenant = get_current_user()
-            if user and tenant:
-                tenant.plan = plan
-                if checkout_session.customer:
-                    tenant.stripe_customer_id = checkout_session.customer
-                if checkout_session.subscription:
-                    tenant.stripe_subscription_id = checkout_session.subscription
-                
-                db.session.commit()
-                
-                # Log the upgrade
-                log_action(tenant.id, user.id, "plan_upgrade", "tenant", tenant.id, 
-                          {"new_plan": plan, "session_id": session_id})
-                
-                flash(f"Successfully upgraded to {PLAN_DETAILS[plan]['name']}!", "success")
-            
-        except Exception as e:
-            logging.error(f"Success page error: {str(e)}")
-            flash("Payment processed, but there was an error updating your account", "warning")
+        # Retrieving the session from Stripe is a slow external call; apply the
+        # upgrade on the scheduler thread (the webhook applies it as well)
+        run_in_background(_apply_checkout_session_id, session_id, job_id=f"checkout_{session_id}")
+        flash("Thanks! We'll update your plan once your payment is confirmed.", "info")
     
     return render_template("success.html")
 
@@ -226,23 +419,87 @@ def stripe_webhook():
         logging.error("Invalid signature")
         return "Invalid signature", 400
 
-    # Handle the event
-    if event['type'] == 'checkout.session.completed':
+    # The tenant updates are single-row DB writes, so they run before the
+    # acknowledgement: a failure answers 500 and Stripe redelivers the event
+    try:
+        _process_stripe_event(event)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Stripe event {event['id']} failed, asking Stripe to retry: {e}")
+        return "Processing failed", 500
+
+    return "Success", 200
+
+def _process_stripe_event(event):
+    """Apply a verified Stripe webhook event; raises if it could not be applied"""
+    # Delayed payment methods complete the session unpaid and settle later
+    if event['type'] in ('checkout.session.completed', 'checkout.session.async_payment_succeeded'):
         session_data = event['data']['object']
-        # Additional webhook processing can be added here
         logging.info(f"Checkout completed: {session_data['id']}")
+        _apply_checkout_session(session_data)
         
     elif event['type'] == 'customer.subscription.deleted':
         subscription = event['data']['object']
         # Handle subscription cancellation
-        from models import Tenant
         tenant = Tenant.query.filter_by(stripe_subscription_id=subscription['id']).first()
         if tenant:
             tenant.plan = "starter"  # Downgrade to free plan
             db.session.commit()
+            invalidate_cached_rows(tenant_id=tenant.id)
             logging.info(f"Subscription cancelled for tenant: {tenant.id}")
 
-    return "Success", 200
+def _apply_checkout_session_id(session_id):
+    """Fetch a Checkout Session from Stripe and apply it"""
+    with app.app_context():
+        try:
+            _apply_checkout_session(stripe.checkout.Session.retrieve(session_id))
+        except Exception as e:
+            logging.error(f"Checkout session {session_id} error: {str(e)}")
+
+def _apply_checkout_session(session_data):
+    """Upgrade the tenant named in a completed, paid Checkout Session's metadata"""
+    if hasattr(session_data, 'to_dict'):
+        session_data = session_data.to_dict()
+    # /success passes any session id it is given; only a paid session upgrades
+    if (session_data.get('status') != 'complete'
+            or session_data.get('payment_status') not in ('paid', 'no_payment_required')):
+        logging.info(f"Checkout {session_data.get('id')} not paid yet, plan unchanged")
+        return
+    metadata = session_data.get('metadata') or {}
+    plan = metadata.get('plan', 'starter')
+    if plan not in PLAN_DETAILS:
+        plan = 'starter'
+    tenant = db.session.get(Tenant, metadata.get('tenant_id'))
+    if not tenant:
+        logging.warning(f"Checkout {session_data.get('id')} has no known tenant")
+        return
+    
+    customer = session_data.get('customer')
+    subscription = session_data.get('subscription')
+    values = {"plan": plan}
+    changed = [Tenant.plan.is_distinct_from(plan)]
+    if customer:
+        values["stripe_customer_id"] = customer
+        changed.append(Tenant.stripe_customer_id.is_distinct_from(customer))
+    if subscription:
+        values["stripe_subscription_id"] = subscription
+        changed.append(Tenant.stripe_subscription_id.is_distinct_from(subscription))
+    
+    # /success and the webhook both deliver the same session, possibly at the
+    # same time; the conditional UPDATE lets exactly one of them apply it
+    result = db.session.execute(
+        update(Tenant).where(Tenant.id==tenant.id, or_(*changed)).values(**values)
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        return
+    
+    # Log the upgrade in the same commit as the plan change
+    log_action(tenant.id, metadata.get('user_id'), "plan_upgrade", "tenant", tenant.id, 
+              {"new_plan": plan, "session_id": session_data.get('id')}, in_transaction=True)
+    
+    db.session.commit()
+    invalidate_cached_rows(tenant_id=tenant.id)
 
 @app.route("/feature/<name>")
 def feature_access(name):
@@ -260,6 +517,22 @@ def feature_access(name):
         "message": f"Feature '{name}' is {'available' if has_access else 'not available'} on the {tenant.plan} plan"
     })
 
+def member_role(tenant_id, user_id):
+    """The user's role in the tenant, or None; reads the role column only"""
+    return db.session.execute(
+        select(Membership.role)
+        .where(Membership.tenant_id==tenant_id, Membership.user_id==user_id)
+        .limit(1)
+    ).scalar()
+
+def _memberships_by_user(tenant_id, *user_ids):
+    """Memberships of the given users in a tenant, with their User rows, keyed by user id"""
+    rows = (Membership.query
+            .options(joinedload(Membership.user))
+            .filter(Membership.tenant_id==tenant_id, Membership.user_id.in_(user_ids))
+            .all())
+    return {m.user_id: m for m in rows}
+
 @app.route("/admin")
 def admin():
     """Admin interface for user management"""
@@ -268,16 +541,25 @@ def admin():
         flash("Session error", "error")
         return redirect(url_for('home'))
     
+    # Get all users for this tenant in one query; the windowed count gives the
+    # seat total on every row and the actor's role comes from the same result
+    load_opts = [joinedload(Membership.user)]
+    if Config.DEBUG:
+        load_opts.append(raiseload('*'))
+    rows = (db.session.query(Membership, func.count().over().label('seat_count'))
+            .options(*load_opts)
+            .filter(Membership.tenant_id==tenant.id)
+            .all())
+    memberships = [m for m, _ in rows]
+    
     # Check if user has admin rights
-    from models import Membership
-    membership = Membership.query.filter_by(tenant_id=tenant.id, user_id=user.id).first()
+    membership = next((m for m in memberships if m.user_id == user.id), None)
     if not membership or membership.role not in ['owner', 'admin']:
         flash("Access denied", "error")
         return redirect(url_for('home'))
     
-    # Get all users and invitations for this tenant
-    from models import User, Invitation
-    memberships = db.session.query(Membership, User).join(User).filter(Membership.tenant_id==tenant.id).all()
+    current_seats = rows[0].seat_count if rows else 0
+    get_cache().set(f"sfs:seats:{tenant.id}", current_seats, expire=SESSION_ROW_TTL)
     invitations = Invitation.query.filter_by(tenant_id=tenant.id, status='pending').all()
     
     return render_template("admin.html", 
@@ -285,7 +567,19 @@ def admin():
                          memberships=memberships, 
                          invitations=invitations,
                          seat_limit=seat_limit_for_plan(tenant.plan),
-                         current_seats=tenant_active_seats(tenant.id))
+                         current_seats=current_seats)
+
+INVITE_SUBJECT_TMPL = "Invitation to join {tenant_name} on SmartFlow Systems"
+INVITE_BODY_TMPL = """
+        You've been invited to join {tenant_name} on SmartFlow Systems.
+        
+        Click here to accept: {invite_url}
+        
+        This invitation expires in 7 days.
+        
+        Best regards,
+        SmartFlow Systems Team
+        """
 
 @app.route("/admin/invite", methods=["POST"])
 def invite_user():
@@ -296,9 +590,7 @@ def invite_user():
         return redirect(url_for('home'))
     
     # Check permissions
-    from models import Membership
-    membership = Membership.query.filter_by(tenant_id=tenant.id, user_id=user.id).first()
-    if not membership or membership.role not in ['owner', 'admin']:
+    if member_role(tenant.id, user.id) not in ['owner', 'admin']:
         flash("Access denied", "error")
         return redirect(url_for('admin'))
     
@@ -310,14 +602,13 @@ def invite_user():
         return redirect(url_for('admin'))
     
     # Check seat limit
-    if tenant_active_seats(tenant.id) >= seat_limit_for_plan(tenant.plan):
+    if seat_limit_reached(tenant.id, seat_limit_for_plan(tenant.plan)):
         flash("Seat limit reached for your plan", "error")
         return redirect(url_for('admin'))
     
-    # Create invitation
-    from models import Invitation
-    token = signer.dumps({'email': email, 'tenant_id': tenant.id, 'role': role})
-    expires_at = datetime.utcnow() + timedelta(days=7)
+    # Create invitation: an opaque random token keys the row; expiry lives on the row too
+    token = secrets.token_urlsafe(24)
+    expires_at = utcnow() + timedelta(days=7)
     
     invitation = Invitation(  # type: ignore
         id=str(uuid.uuid4()),
@@ -330,91 +621,77 @@ def invite_user():
     )
     
     db.session.add(invitation)
+    # The audit row rides on the invitation's commit
+    log_action(tenant.id, user.id, "user_invited", "invitation", invitation.id, 
+              {"email": email, "role": role}, in_transaction=True)
     db.session.commit()
     
     # Send invitation email
     try:
-        invite_url = url_for('accept_invitation', token=token, _external=True)
-        subject = f"Invitation to join {tenant.name} on SmartFlow Systems"
-        body = f"""
-        You've been invited to join {tenant.name} on SmartFlow Systems.
-        
-        Click here to accept: {invite_url}
-        
-        This invitation expires in 7 days.
-        
-        Best regards,
-        SmartFlow Systems Team
-        """
+        domain = request.host_url.rstrip('/')
+        subject = INVITE_SUBJECT_TMPL.format(tenant_name=tenant.name)
+        body = INVITE_BODY_TMPL.format(tenant_name=tenant.name, invite_url=f"{domain}/accept/{token}")
         
-        send_email_smtp(email, subject, body)
+        # SMTP can take seconds; hand it to the scheduler and answer now
+        run_in_background(send_email_smtp, email, subject, body)
         flash(f"Invitation sent to {email}", "success")
         
     except Exception as e:
         logging.error(f"Failed to send invitation email: {str(e)}")
         flash(f"Invitation created but email failed to send to {email}", "warning")
     
-    log_action(tenant.id, user.id, "user_invited", "invitation", invitation.id, 
-              {"email": email, "role": role})
-    
     return redirect(url_for('admin'))
 
 @app.route("/accept/<token>")
 def accept_invitation(token):
     """Accept an invitation"""
-    try:
-        data = signer.loads(token, max_age=7*24*3600)  # 7 days
-        email = data['email']
-        tenant_id = data['tenant_id']
-        role = data['role']
-        
-        from models import Invitation, User, Membership, Tenant
-        
-        # Find the invitation
-        invitation = Invitation.query.filter_by(token=token, status='pending').first()
-        if not invitation:
-            flash("Invalid or expired invitation", "error")
-            return redirect(url_for('home'))
-        
-        # Create or find user
-        user = User.query.filter_by(email=email).first()
-        if not user:
-            user = User(id=str(uuid.uuid4()), email=email, name=email.split('@')[0])  # type: ignore
-            db.session.add(user)
-        
-        # Create membership
-        membership = Membership(  # type: ignore
-            tenant_id=tenant_id,
-            user_id=user.id,
-            role=role,
-            invited_at=invitation.created_at,
-            activated_at=datetime.utcnow()
-        )
-        db.session.add(membership)
-        
-        # Mark invitation as accepted
-        invitation.status = 'accepted'
-        
+    invitation = Invitation.query.filter_by(token=token, status='pending').first()
+    if not invitation:
+        flash("Invalid invitation link", "error")
+        return redirect(url_for('home'))
+    if invitation.expires_at < utcnow():
+        invitation.status = 'expired'
         db.session.commit()
-        
-        # Set session
-        session['user_id'] = user.id
-        session['tenant_id'] = tenant_id
-        
-        tenant = Tenant.query.get(tenant_id)
-        if tenant:
-            flash(f"Welcome to {tenant.name}!", "success")
-        
-        log_action(tenant_id, user.id, "invitation_accepted", "membership", f"{tenant_id}:{user.id}")
-        
-        return redirect(url_for('admin'))
-        
-    except SignatureExpired:
         flash("Invitation has expired", "error")
         return redirect(url_for('home'))
-    except BadSignature:
-        flash("Invalid invitation link", "error")
-        return redirect(url_for('home'))
+    email = invitation.email
+    tenant_id = invitation.tenant_id
+    role = invitation.role
+    
+    # Create or find user
+    user = User.query.filter_by(email=email).first()
+    if not user:
+        user = User(id=str(uuid.uuid4()), email=email, name=email.split('@')[0])  # type: ignore
+        db.session.add(user)
+    
+    # Create membership
+    membership = Membership(  # type: ignore
+        tenant_id=tenant_id,
+        user_id=user.id,
+        role=role,
+        invited_at=invitation.created_at,
+        activated_at=utcnow()
+    )
+    db.session.add(membership)
+    
+    # Mark invitation as accepted
+    invitation.status = 'accepted'
+    
+    db.session.commit()
+    invalidate_seat_count(tenant_id)
+    
+    # Set session
+    session['user_id'] = user.id
+    session['tenant_id'] = tenant_id
+    g.pop('_current_user', None)
+    
+    tenant = db.session.get(Tenant, tenant_id)
+    if tenant:
+        flash(f"Welcome to {tenant.name}!", "success")
+    
+    log_action(tenant_id, user.id, "invitation_accepted", "membership", f"{tenant_id}:{user.id}")
+    
+    return redirect(url_for('admin'))
 
 @app.route("/admin/suspend/<user_id>", methods=["POST"])
 def suspend_user(user_id):
@@ -424,17 +701,19 @@ def suspend_user(user_id):
         flash("Session error", "error")
         return redirect(url_for('home'))
     
-    # Check permissions
-    from models import Membership, User
-    membership = Membership.query.filter_by(tenant_id=tenant.id, user_id=user.id).first()
+    # Check permissions; the actor's and target's memberships come back together
+    members = _memberships_by_user(tenant.id, user.id, user_id)
+    membership = members.get(user.id)
     if not membership or membership.role not in ['owner', 'admin']:
         flash("Access denied", "error")
         return redirect(url_for('admin'))
     
-    target_user = User.query.get(user_id)
+    target = members.get(user_id)
+    target_user = target.user if target else None
     if target_user:
         target_user.status = 'suspended'
         db.session.commit()
+        invalidate_cached_rows(user_id=user_id)
         
         flash(f"User {target_user.email} has been suspended", "success")
         log_action(tenant.id, user.id, "user_suspended", "user", user_id)
@@ -449,17 +728,19 @@ def reactivate_user(user_id):
         flash("Session error", "error")
         return redirect(url_for('home'))
     
-    # Check permissions
-    from models import Membership, User
-    membership = Membership.query.filter_by(tenant_id=tenant.id, user_id=user.id).first()
+    # Check permissions; the actor's and target's memberships come back together
+    members = _memberships_by_user(tenant.id, user.id, user_id)
+    membership = members.get(user.id)
     if not membership or membership.role not in ['owner', 'admin']:
         flash("Access denied", "error")
         return redirect(url_for('admin'))
     
-    target_user = User.query.get(user_id)
+    target = members.get(user_id)
+    target_user = target.user if target else None
     if target_user:
         target_user.status = 'active'
         db.session.commit()
+        invalidate_cached_rows(user_id=user_id)
         
         flash(f"User {target_user.email} has been reactivated", "success")
         log_action(tenant.id, user.id, "user_reactivated", "user", user_id)
@@ -478,11 +759,11 @@ def create_booking(tenant_id):
     if not start_at_iso:
         return ("start_at (ISO) required", 400)
     try:
-        start_at = datetime.fromisoformat(start_at_iso.replace("Z", "+00:00")).replace(tzinfo=None)
-    except Exception:
+        # Python 3.11's fromisoformat reads a trailing "Z" directly
+        start_at = to_naive_utc(datetime.fromisoformat(start_at_iso))
+    except (TypeError, ValueError):
         return ("Invalid start_at format", 400)
 
-    from models import Booking
     b = Booking(  # type: ignore
         id=str(uuid.uuid4())[:12],
         tenant_id=tenant_id,
@@ -494,27 +775,53 @@ def create_booking(tenant_id):
     )
     db.session.add(b)
     db.session.commit()
+
+    s = db.session.get(NotificationSettings, tenant_id)
+    hours = s.reminder_hours_before if s and s.reminder_hours_before is not None else 24
+    try:
+        schedule_next_reminder(start_at - timedelta(hours=hours))
+    except Exception as e:
+        logging.error(f"Failed to schedule booking reminder: {e}")
     return {"ok": True, "booking_id": b.id}
 
 @app.route("/api/tenants/<tenant_id>/bookings", methods=["GET"])
 def list_bookings(tenant_id):
     """List upcoming bookings for tenant (next 72h)"""
-    from models import Booking
-    now = datetime.utcnow()
-    rows = (Booking.query
-            .filter(Booking.tenant_id==tenant_id,
-                    Booking.start_at >= now,
-                    Booking.status=="confirmed")
-            .order_by(Booking.start_at.asc())
-            .limit(50).all())
-    out = []
-    for b in rows:
-        out.append({
-            "id": b.id, "customer_name": b.customer_name,
-            "email": b.customer_email, "phone": b.customer_phone,
-            "start_at": b.start_at.isoformat()+"Z", "status": b.status
-        })
-    return out
+    now = utcnow()
+    upcoming = (Booking.tenant_id==tenant_id,
+                Booking.start_at >= now,
+                Booking.status=="confirmed")
+    # Bookings are insert-only, so count + start/created bounds change whenever
+    # the listing does; one index-covered aggregate decides the 304 before any
+    # rows are loaded or serialized
+    count, first_start, last_start, last_created = db.session.execute(
+        select(func.count(), func.min(Booking.start_at),
+               func.max(Booking.start_at), func.max(Booking.created_at))
+        .where(*upcoming)
+    ).one()
+    etag = "-".join([str(count)] + [f"{dt.timestamp():.0f}" if dt else "0"
+                                    for dt in (first_start, last_start, last_created)])
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+        resp.set_etag(etag)
+        return resp
+
+    # Column-level select: no ORM instances or identity-map bookkeeping
+    rows = db.session.execute(
+        select(Booking.id, Booking.customer_name, Booking.customer_email,
+               Booking.customer_phone, Booking.start_at, Booking.status)
+        .where(*upcoming)
+        .order_by(Booking.start_at.asc())
+        .limit(50)
+    ).all()
+    # orjson renders naive UTC datetimes as ISO-8601 with a Z suffix itself
+    resp = jsonify([{"id": r.id, "customer_name": r.customer_name,
+                     "email": r.customer_email, "phone": r.customer_phone,
+                     "start_at": r.start_at if ORJSON_AVAILABLE else r.start_at.isoformat()+"Z",
+                     "status": r.status}
+                    for r in rows])
+    resp.set_etag(etag)
+    return resp
 
 @app.route("/settings/notifications", methods=["GET", "POST"])
 def notification_settings():
@@ -530,8 +837,7 @@ def notification_settings():
         sms_enabled = bool(data.get("sms_enabled"))
         reminder_hours = int(data.get("reminder_hours_before", 24))
         
-        from models import NotificationSettings
-        settings = NotificationSettings.query.get(tenant.id)
+        settings = db.session.get(NotificationSettings, tenant.id)
         if not settings:
             settings = NotificationSettings(tenant_id=tenant.id)  # type: ignore
             db.session.add(settings)
@@ -539,9 +845,13 @@ def notification_settings():
         settings.email_enabled = email_enabled
         settings.sms_enabled = sms_enabled
         settings.reminder_hours_before = reminder_hours
-        settings.updated_at = datetime.utcnow()
         
         db.session.commit()
+        # A new lead time moves every pending reminder for this tenant
+        try:
+            schedule_next_reminder()
+        except Exception as e:
+            logging.error(f"Failed to reschedule booking reminders: {e}")
         
         if request.is_json:
             return {"ok": True, "message": "Settings updated"}
@@ -560,82 +870,238 @@ def notification_settings():
         }
     else:
         # Return a simple form for testing
-        return f"""
-        <h2>Notification Settings for {tenant.name}</h2>
-        <form method="POST">
-            <label><input type="checkbox" name="email_enabled" {'checked' if settings.email_enabled else ''}> Email Reminders</label><br>
-            <label><input type="checkbox" name="sms_enabled" {'checked' if settings.sms_enabled else ''}> SMS Reminders</label><br>
-            <label>Hours before appointment: <input type="number" name="reminder_hours_before" value="{settings.reminder_hours_before}"></label><br>
-            <button type="submit">Save Settings</button>
-        </form>
-        <a href="/admin">Back to Admin</a>
-        """
+        return render_template("notif_settings.html", tenant=tenant, settings=settings)
+
+# Sent reminders are logged in chunks so a crash mid-run loses at most one chunk
+REMINDER_LOG_BATCH = 100
+REMINDER_SEND_WORKERS = 16
+REMINDER_SEND_TIMEOUT = 15  # seconds per SMTP/Twilio send
+_reminder_pool = ThreadPoolExecutor(max_workers=REMINDER_SEND_WORKERS, thread_name_prefix="reminder")
+
+# Reminders go out for bookings within this distance of their send time
+REMINDER_WINDOW = timedelta(minutes=5)
+REMINDER_JOB_ID = "booking_reminders"
+
+# Tenants without a settings row get the model defaults (email on, 24h)
+REMINDER_HOURS = func.coalesce(NotificationSettings.reminder_hours_before, 24)
+
+def _reminders_enabled():
+    """SQL predicate mirroring _channel_enabled(): some reminder channel is on"""
+    channels = [NotificationSettings.tenant_id.is_(None), NotificationSettings.email_enabled.is_(True)]
+    if TWILIO_CONFIGURED:
+        channels.append(NotificationSettings.sms_enabled.is_(True))
+    return or_(*channels)
+
+def _reminder_offsets():
+    """Distinct reminder lead times, in hours, over tenants that have a channel on"""
+    return [h for (h,) in (db.session.query(REMINDER_HOURS)
+                           .select_from(Tenant)
+                           .outerjoin(NotificationSettings, NotificationSettings.tenant_id==Tenant.id)
+                           .filter(_reminders_enabled())
+                           .distinct())]
+
+def _flush_reminder_logs(reminder_logs: list):
+    """Insert pending ReminderLog rows in one statement and clear the list"""
+    if not reminder_logs:
+        return
+    try:
+        db.session.execute(ReminderLog.__table__.insert(), reminder_logs)
+        db.session.commit()
+    except IntegrityError:
+        # Another run logged some of these first; keep the rows that are still new
+        db.session.rollback()
+        for row in reminder_logs:
+            try:
+                db.session.execute(ReminderLog.__table__.insert(), row)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+    reminder_logs.clear()
+
+# Reminder passes never overlap. The job may start a second instance while
+# one is running (max_instances=2 on the job); that instance only asks the
+# running one for another pass, so a booking added mid-run is still scanned
+_reminder_state_lock = threading.Lock()
+_reminder_running = False
+_reminder_rerun = False
 
 def _send_booking_reminders():
     """Background job to send booking reminders"""
+    global _reminder_running, _reminder_rerun
+    with _reminder_state_lock:
+        if _reminder_running:
+            _reminder_rerun = True
+            return
+        _reminder_running = True
+        _reminder_rerun = False
+
     with app.app_context():
+        started = utcnow()
         try:
-            from models import Tenant, Booking, ReminderLog
-            now = datetime.utcnow()
-            # Scan all tenants that have settings (fallback to demo-tenant if none)
-            tenant_ids = [t.id for t in Tenant.query.all()]
-            for tid in tenant_ids:
-                s = get_or_create_notif_settings(tid)
-                hours = int(s.reminder_hours_before or 24)
-
-                # Window: appointments that start between (now + hours) and (now + hours + 5min)
-                win_start = now + timedelta(hours=hours)
-                win_end = win_start + timedelta(minutes=5)
-
-                candidates = (Booking.query
-                              .filter(Booking.tenant_id==tid,
-                                      Booking.status=="confirmed",
-                                      Booking.start_at >= win_start,
-                                      Booking.start_at < win_end)
-                              .all())
-                for b in candidates:
-                    # Email
-                    if notif_ok(tid, "email") and b.customer_email:
-                        already = ReminderLog.query.filter_by(booking_id=b.id, channel="email", kind="before").first()
-                        if not already:
-                            body = f"Reminder: {b.customer_name}, you have an appointment at {b.start_at}."
-                            try:
-                                send_email_smtp(b.customer_email, "Appointment reminder", body)
-                                db.session.add(ReminderLog(tenant_id=tid, booking_id=b.id, channel="email", kind="before"))  # type: ignore
-                                db.session.commit()
-                                print(f"[reminder] email sent for {b.id}")
-                            except Exception as e:
-                                print("[reminder] email error:", e)
-
-                    # SMS
-                    if notif_ok(tid, "sms") and b.customer_phone:
-                        already = ReminderLog.query.filter_by(booking_id=b.id, channel="sms", kind="before").first()
-                        if not already:
-                            msg = f"Reminder: your appointment is at {b.start_at}."
-                            try:
-                                from onboarding import send_twilio_message
-                                ok = send_twilio_message(b.customer_phone, msg)
-                                if ok:
-                                    db.session.add(ReminderLog(tenant_id=tid, booking_id=b.id, channel="sms", kind="before"))  # type: ignore
-                                    db.session.commit()
-                                    print(f"[reminder] sms sent for {b.id}")
-                            except Exception as e:
-                                print("[reminder] sms error:", e)
-        except Exception as e:
-            print("[scheduler] loop error:", e)
+            while True:
+                _reminder_pass(started)
+                # End the pass's transaction so the next one sees new bookings
+                db.session.close()
+                with _reminder_state_lock:
+                    if not _reminder_rerun:
+                        break
+                    _reminder_rerun = False
+                started = utcnow()
+        finally:
+            with _reminder_state_lock:
+                _reminder_running = False
+            try:
+                schedule_next_reminder(run_started=started)
+            except Exception as e:
+                logger.exception("[scheduler] reschedule error: %s", e)
+
+def _reminder_pass(now):
+    """Send the reminders due at `now` that have not been sent yet"""
+    try:
+        hours = REMINDER_HOURS
+        offsets = _reminder_offsets()
+        if not offsets:
+            return
+
+        # Window per offset: appointments that start within REMINDER_WINDOW of (now + hours);
+        # the look-back covers a job that fired a little late, ReminderLog stops repeats
+        windows = [and_(hours==h,
+                        Booking.start_at >= now + timedelta(hours=int(h)) - REMINDER_WINDOW,
+                        Booking.start_at < now + timedelta(hours=int(h)) + REMINDER_WINDOW)
+                   for h in offsets]
+        email_log = aliased(ReminderLog)
+        sms_log = aliased(ReminderLog)
+        rows = (db.session.query(Booking, NotificationSettings, email_log.id, sms_log.id)
+                .join(Tenant, Tenant.id==Booking.tenant_id)
+                .outerjoin(NotificationSettings, NotificationSettings.tenant_id==Booking.tenant_id)
+                .outerjoin(email_log, and_(email_log.booking_id==Booking.id,
+                                           email_log.channel=="email", email_log.kind=="before"))
+                .outerjoin(sms_log, and_(sms_log.booking_id==Booking.id,
+                                         sms_log.channel=="sms", sms_log.kind=="before"))
+                .filter(Booking.status=="confirmed",
+                        _reminders_enabled(),
+                        or_(*windows),
+                        or_(email_log.id.is_(None), sms_log.id.is_(None)))
+                .all())
+
+        # Sends are network-bound; fan them out and log each one as it lands
+        sends = {}
+        for b, s, email_sent, sms_sent in rows:
+            # Email
+            if email_sent is None and _channel_enabled(s, "email") and b.customer_email:
+                body = f"Reminder: {b.customer_name}, you have an appointment at {b.start_at}."
+                sends[_reminder_pool.submit(send_email_smtp, b.customer_email, "Appointment reminder", body)] = (b, "email")
+
+            # SMS
+            if sms_sent is None and _channel_enabled(s, "sms") and b.customer_phone:
+                msg = f"Reminder: your appointment is at {b.start_at}."
+                sends[_reminder_pool.submit(send_twilio_message, b.customer_phone, msg)] = (b, "sms")
+
+        reminder_logs = []
+        # Every worker may take up to REMINDER_SEND_TIMEOUT per send it runs
+        deadline = REMINDER_SEND_TIMEOUT * -(-len(sends) // REMINDER_SEND_WORKERS)
+        try:
+            for fut in as_completed(sends, timeout=deadline):
+                b, channel = sends[fut]
+                try:
+                    ok = fut.result()
+                except Exception as e:
+                    logger.error("[reminder] %s error: %s", channel, e)
+                    continue
+                if channel == "sms" and not ok:
+                    continue
+                reminder_logs.append({"tenant_id": b.tenant_id, "booking_id": b.id, "channel": channel, "kind": "before"})
+                logger.info("[reminder] %s sent for %s", channel, b.id)
+                if len(reminder_logs) >= REMINDER_LOG_BATCH:
+                    _flush_reminder_logs(reminder_logs)
+        except FuturesTimeout:
+            logger.warning("[reminder] sends still pending after %ss were not logged", deadline)
+        _flush_reminder_logs(reminder_logs)
+    except Exception as e:
+        logger.exception("[scheduler] loop error: %s", e)
+
+def _next_reminder_at(now, run_started=None):
+    """Earliest send time of a reminder still to go out, or None.
+
+    With run_started, bookings inside the window of the pass that started then
+    are left out; otherwise reminders that are due but still within the
+    look-back window count too, and come back as a time at or before `now`.
+    """
+    hours = REMINDER_HOURS
+    offsets = _reminder_offsets()
+    if not offsets:
+        return None
+    if run_started is None:
+        after = lambda h: now + timedelta(hours=h) - REMINDER_WINDOW
+    else:
+        after = lambda h: run_started + timedelta(hours=h) + REMINDER_WINDOW
+    pending = [and_(hours==h, Booking.start_at >= after(int(h))) for h in offsets]
+    rows = (db.session.query(hours, func.min(Booking.start_at))
+            .select_from(Booking)
+            .join(Tenant, Tenant.id==Booking.tenant_id)
+            .outerjoin(NotificationSettings, NotificationSettings.tenant_id==Booking.tenant_id)
+            .filter(Booking.status=="confirmed", _reminders_enabled(), or_(*pending))
+            .group_by(hours)
+            .all())
+    return min((start_at - timedelta(hours=int(h)) for h, start_at in rows if start_at), default=None)
+
+def schedule_next_reminder(fire_at=None, run_started=None):
+    """Point the reminders job at `fire_at` (naive UTC), or at the next due reminder when None.
+
+    The job is only ever moved earlier: a pending run may cover a reminder the
+    recompute can't see, and a run that finds nothing due just schedules the
+    next one. The reminders job passes the start time of its last pass as
+    run_started. Nothing new is scheduled while no booking needs a reminder.
+    """
+    now = utcnow()
+    if fire_at is None:
+        fire_at = _next_reminder_at(now, run_started=run_started)
+    if fire_at is None or fire_at < now - REMINDER_WINDOW:
+        return
+    run_date = max(fire_at, now).replace(tzinfo=timezone.utc)
+    job = scheduler.get_job(REMINDER_JOB_ID)
+    if job and job.next_run_time and job.next_run_time <= run_date:
+        return
+    scheduler.add_job(_send_booking_reminders, "date", run_date=run_date, id=REMINDER_JOB_ID,
+                      replace_existing=True, max_instances=2,
+                      misfire_grace_time=int(REMINDER_WINDOW.total_seconds()))
 
 # Initialize APScheduler
-scheduler = BackgroundScheduler(daemon=True)
-scheduler.add_job(_send_booking_reminders, "interval", minutes=5, id="reminders_every_5m", replace_existing=True)
+# The audit flush runs every second; keep per-run scheduler chatter out of the logs
+logging.getLogger("apscheduler").setLevel(logging.WARNING)
+# Reminder runs are one-off "date" jobs scheduled by schedule_next_reminder(),
+# so an idle system never wakes up to scan bookings. Jobs run one instance at
+# a time (the reminders job serializes its own passes), and a backlog of
+# missed runs fires once
+scheduler = BackgroundScheduler(timezone=timezone.utc,
+                                job_defaults={"max_instances": 1, "coalesce": True, "misfire_grace_time": 120})
+scheduler.add_job(_flush_audit_log, "interval", seconds=1, id="audit_flush_1s", replace_existing=True)
+
+def _shutdown_scheduler():
+    """Stop the scheduler, letting running jobs finish, then write out queued audit rows"""
+    try:
+        scheduler.shutdown(wait=True)
+    except SchedulerNotRunningError:
+        pass
+    _flush_audit_log()
+    unwritten = len(_audit_retry) + _audit_queue.qsize()
+    if unwritten:
+        logging.error(f"Audit log flush failed at shutdown, lost {unwritten} rows")
+
+atexit.register(_shutdown_scheduler)
 try:
     scheduler.start()
-    print("[scheduler] Started booking reminders scheduler")
+    logger.info("[scheduler] Started booking reminders scheduler")
 except Exception as e:
-    print("[scheduler] start error:", e)
+    logger.error("[scheduler] start error: %s", e)
 
 @app.after_request
 def add_no_cache(resp):
-    resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+    if resp.get_etag()[0]:
+        # Conditional responses may be kept, but must be revalidated every time
+        resp.headers["Cache-Control"] = "private, no-cache, must-revalidate, max-age=0"
+    else:
+        resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
     resp.headers["Pragma"] = "no-cache"
     resp.headers["Expires"] = "0"
     return resp
@@ -643,10 +1109,16 @@ def add_no_cache(resp):
 
 # ---- DB init at startup (non-fatal if DB down) ----
 def init_db():
-    from sqlalchemy.exc import OperationalError
     with app.app_context():
         try:
             db.create_all()
+            # create_all() skips tables that already exist, so add any
+            # indexes introduced since the table was first created
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(db.engine, checkfirst=True)
             app.logger.info("DB ready ✅ using %s", Config.SQLALCHEMY_DATABASE_URI)
+            ensure_demo_seed()
+            schedule_next_reminder()
         except OperationalError as e:
             app.logger.warning("DB unavailable, running degraded: %s", e)
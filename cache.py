@@ -5,8 +5,13 @@ High-performance caching with Redis backend and in-memory fallback
 
 import os
 import json
+import math
+import hashlib
 import logging
 import pickle
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Optional, Callable
 from functools import wraps
 from datetime import timedelta
@@ -20,13 +25,144 @@ except ImportError:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available. Using in-memory cache fallback.")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+# Redis values carry a one-byte format tag. JSON-native payloads are stored as
+# orjson; anything else (tuples, datetimes, dataclasses) is pickled so it comes
+# back unchanged. Untagged values were written before the tag and are pickles.
+_JSON_TAG = b"j"
+_PICKLE_TAG = b"p"
+
+
+def _is_json_native(value: Any) -> bool:
+    """True if value survives a JSON round-trip with the same types"""
+    kind = type(value)
+    if value is None or kind is str or kind is bool:
+        return True
+    if kind is int:
+        return -2 ** 63 <= value < 2 ** 64
+    if kind is float:
+        return math.isfinite(value)
+    if kind is list:
+        return all(_is_json_native(item) for item in value)
+    if kind is dict:
+        return all(type(k) is str and _is_json_native(v) for k, v in value.items())
+    return False
+
+
+def _serialize(value: Any) -> bytes:
+    """Encode a value for Redis"""
+    if ORJSON_AVAILABLE and _is_json_native(value):
+        return _JSON_TAG + orjson.dumps(value)
+    return _PICKLE_TAG + pickle.dumps(value)
+
+
+def _deserialize(data: bytes) -> Any:
+    """Decode a value written by _serialize (or an untagged legacy pickle)"""
+    tag = data[:1]
+    if tag == _JSON_TAG:
+        return orjson.loads(data[1:]) if ORJSON_AVAILABLE else json.loads(data[1:])
+    if tag == _PICKLE_TAG:
+        return pickle.loads(data[1:])
+    return pickle.loads(data)
+
+
+# Entries kept by the in-memory fallback before the least recently used is evicted
+MEMORY_CACHE_MAXSIZE = int(os.environ.get("MEMORY_CACHE_MAXSIZE", "10000"))
+
+_MISSING = object()
+
+
+class _MemoryCache:
+    """
+    Bounded LRU dict with per-entry expiry, safe to share between threads
+
+    Entries are (value, expires_at) with expires_at on the monotonic clock, or
+    None for no expiry; expired entries are dropped when next touched.
+    """
+
+    def __init__(self, maxsize: int = MEMORY_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _entry(self, key: str):
+        """Live entry for key, refreshed as most recently used; caller holds the lock"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """Insert and evict past maxsize; caller holds the lock"""
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entry(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + expire if expire else None
+        with self._lock:
+            self._store(key, value, expires_at)
+
+    def set_many(self, mapping: dict, expire: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + expire if expire else None
+        with self._lock:
+            for key, value in mapping.items():
+                self._store(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int) -> int:
+        """Add to a counter, keeping its expiry like Redis INCRBY"""
+        with self._lock:
+            entry = self._entry(key)
+            value = (entry[0] if entry else 0) + amount
+            self._store(key, value, entry[1] if entry else None)
+            return value
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+            return count
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._entry(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
 
 class Cache:
     """Universal cache with Redis backend and in-memory fallback"""
 
     def __init__(self):
         self.redis_client = None
-        self.memory_cache = {}  # Fallback cache
+        self.memory_cache = _MemoryCache()  # Fallback cache
 
         # Try to connect to Redis
         if REDIS_AVAILABLE:
@@ -54,8 +190,8 @@ class Cache:
         if self.redis_client:
             try:
                 value = self.redis_client.get(key)
-                if value:
-                    return pickle.loads(value)
+                if value is not None:
+                    return _deserialize(value)
                 return None
             except Exception as e:
                 logger.error(f"Redis get error: {e}")
@@ -70,7 +206,7 @@ class Cache:
 
         Args:
             key: Cache key
-            value: Value to cache (must be pickleable)
+            value: Value to cache (JSON-compatible, or else pickleable)
             expire: Expiration time in seconds (None = no expiration)
 
         Returns:
@@ -78,7 +214,7 @@ class Cache:
         """
         if self.redis_client:
             try:
-                serialized = pickle.dumps(value)
+                serialized = _serialize(value)
                 if expire:
                     self.redis_client.setex(key, expire, serialized)
                 else:
@@ -89,7 +225,7 @@ class Cache:
                 return False
 
         # In-memory fallback
-        self.memory_cache[key] = value
+        self.memory_cache.set(key, value, expire)
         return True
 
     def delete(self, key: str) -> bool:
@@ -103,8 +239,7 @@ class Cache:
                 return False
 
         # In-memory fallback
-        if key in self.memory_cache:
-            del self.memory_cache[key]
+        self.memory_cache.delete(key)
         return True
 
     def exists(self, key: str) -> bool:
@@ -142,9 +277,7 @@ class Cache:
                 return 0
 
         # In-memory fallback
-        count = len(self.memory_cache)
-        self.memory_cache.clear()
-        return count
+        return self.memory_cache.clear()
 
     def incr(self, key: str, amount: int = 1) -> int:
         """Increment a counter"""
@@ -156,10 +289,7 @@ class Cache:
                 return 0
 
         # In-memory fallback
-        current = self.memory_cache.get(key, 0)
-        new_value = current + amount
-        self.memory_cache[key] = new_value
-        return new_value
+        return self.memory_cache.incr(key, amount)
 
     def get_many(self, keys: list[str]) -> dict:
         """Get multiple keys at once"""
@@ -168,27 +298,34 @@ class Cache:
                 values = self.redis_client.mget(keys)
                 result = {}
                 for key, value in zip(keys, values):
-                    if value:
-                        result[key] = pickle.loads(value)
+                    if value is not None:
+                        result[key] = _deserialize(value)
                 return result
             except Exception as e:
                 logger.error(f"Redis get_many error: {e}")
                 return {}
 
         # In-memory fallback
-        return {key: self.memory_cache.get(key) for key in keys if key in self.memory_cache}
+        result = {}
+        for key in keys:
+            value = self.memory_cache.get(key, _MISSING)
+            if value is not _MISSING:
+                result[key] = value
+        return result
 
     def set_many(self, mapping: dict, expire: Optional[int] = None) -> bool:
         """Set multiple key-value pairs"""
         if self.redis_client:
             try:
-                pipe = self.redis_client.pipeline()
-                for key, value in mapping.items():
-                    serialized = pickle.dumps(value)
-                    if expire:
-                        pipe.setex(key, expire, serialized)
-                    else:
-                        pipe.set(key, serialized)
+                if not mapping:
+                    return True
+                serialized = {key: _serialize(value) for key, value in mapping.items()}
+                # No MULTI/EXEC: one MSET plus per-key EXPIREs in a single round-trip
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.mset(serialized)
+                if expire:
+                    for key in serialized:
+                        pipe.expire(key, expire)
                 pipe.execute()
                 return True
             except Exception as e:
@@ -196,7 +333,7 @@ class Cache:
                 return False
 
         # In-memory fallback
-        self.memory_cache.update(mapping)
+        self.memory_cache.set_many(mapping, expire)
         return True
 
 
@@ -216,6 +353,19 @@ def get_cache() -> Cache:
 # Decorators
 # ===================
 
+def _args_digest(args: tuple, kwargs: dict) -> str:
+    """Fixed-width hex digest of call arguments, for use in cache keys"""
+    items = sorted(kwargs.items())
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps((args, items), default=str, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps((args, items), default=str).encode()
+
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(payload)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
 def cached(expire: int = 300, key_prefix: str = ""):
     """
     Decorator to cache function results
@@ -236,8 +386,8 @@ def cached(expire: int = 300, key_prefix: str = ""):
 
             # Build cache key
             func_name = f.__name__
-            args_str = str(args) + str(sorted(kwargs.items()))
-            cache_key = f"{key_prefix}:{func_name}:{args_str}" if key_prefix else f"{func_name}:{args_str}"
+            digest = _args_digest(args, kwargs)
+            cache_key = f"{key_prefix}:{func_name}:{digest}" if key_prefix else f"{func_name}:{digest}"
 
             # Try to get from cache
             result = cache.get(cache_key)
@@ -11,6 +11,9 @@ class Config:
         "pool_recycle": 300,
         "pool_pre_ping": True,
     }
+    # SQLite connections are file handles; only size the pool for a real server
+    if not SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+        SQLALCHEMY_ENGINE_OPTIONS.update(pool_size=10, max_overflow=20)
 
     # Stripe Keys
     STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
@@ -73,3 +76,10 @@ PLAN_DETAILS = {
         "features": ["AI Concierge + analytics", "Recovery automations", "Priority support", "3 templates"]
     }
 }
+
+# Stripe price IDs keyed by (plan, mode), resolved once at import
+PRICE_IDS = {
+    (plan, mode): getattr(Config, f"STRIPE_PRICE_{plan.upper()}_{mode.upper()}", None)
+    for plan in PLAN_DETAILS
+    for mode in ("monthly", "oneoff")
+}
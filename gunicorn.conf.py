@@ -0,0 +1,17 @@
+"""
+Gunicorn settings, picked up automatically when gunicorn starts in this directory
+(e.g. `gunicorn --bind 0.0.0.0:5000 main:app`)
+"""
+
+import os
+
+# Every worker process starts its own APScheduler (booking reminders, audit
+# flush), so concurrency comes from threads; only raise WEB_CONCURRENCY once
+# reminders run outside the web processes
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Heartbeat files on tmpfs so a slow disk can't stall the arbiter
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
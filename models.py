@@ -1,7 +1,9 @@
 from database import db
 from datetime import datetime
 import uuid
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 
 class Tenant(db.Model):
     __tablename__ = "tenants"
@@ -21,6 +23,7 @@ class User(db.Model):
     status = db.Column(db.String(20), default="active")  # active|suspended|deleted
     stripe_customer_id = db.Column(db.String(128), unique=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    memberships = relationship("Membership", back_populates="user")
 
 class Membership(db.Model):
     __tablename__ = "memberships"
@@ -29,6 +32,7 @@ class Membership(db.Model):
     role = db.Column(db.String(20), default="staff")  # owner|admin|staff|analyst
     invited_at = db.Column(db.DateTime)
     activated_at = db.Column(db.DateTime)
+    user = relationship("User", back_populates="memberships")
 
 class Invitation(db.Model):
     __tablename__ = "invitations"
@@ -36,11 +40,13 @@ class Invitation(db.Model):
     tenant_id = db.Column(db.String(64), db.ForeignKey("tenants.id"))
     email = db.Column(db.String(255), index=True, nullable=False)
     role = db.Column(db.String(20), nullable=False)
-    token = db.Column(db.String(512), nullable=False)
+    token = db.Column(db.String(64), unique=True, index=True, nullable=False)
     expires_at = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.String(20), default="pending")  # pending|accepted|expired
     inviter_user_id = db.Column(db.String(64))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # /admin lists a tenant's pending invitations on every render
+    __table_args__ = (Index('ix_invitation_tenant_status', 'tenant_id', 'status'),)
 
 class AuditLog(db.Model):
     __tablename__ = "audit_logs"
@@ -50,7 +56,8 @@ class AuditLog(db.Model):
     action = db.Column(db.String(64))
     target_type = db.Column(db.String(64))
     target_id = db.Column(db.String(64))
-    event_data = db.Column(db.Text)  # JSON string (lightweight)
+    # NULL when the action carries no metadata; binary JSONB on Postgres
+    event_data = db.Column(db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class NotificationSettings(db.Model):
@@ -72,6 +79,8 @@ class Booking(db.Model):
     start_at = db.Column(db.DateTime, index=True)  # appointment start (UTC)
     status = db.Column(db.String(20), default="confirmed")  # confirmed|cancelled|completed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Covers list_bookings and the reminder window scan
+    __table_args__ = (Index('ix_booking_tenant_status_start', 'tenant_id', 'status', 'start_at'),)
 
 class ReminderLog(db.Model):
     __tablename__ = "reminder_logs"
@@ -1,8 +1,55 @@
 import smtplib
 import logging
+import threading
+import time
 from email.mime.text import MIMEText
 from config import Config
 
+SMTP_TIMEOUT = 10  # seconds
+SMTP_MAX_AGE = 300  # recycle connections after this many seconds
+
+class SMTPPool:
+    """Keeps one logged-in SMTP connection per thread and reuses it across sends"""
+
+    def __init__(self, max_age: float = SMTP_MAX_AGE):
+        self.max_age = max_age
+        self._local = threading.local()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(Config.SMTP_HOST, Config.SMTP_PORT, timeout=SMTP_TIMEOUT)
+        server.starttls()
+        server.login(Config.SMTP_USER, Config.SMTP_PASS)
+        self._local.conn = server
+        self._local.opened_at = time.monotonic()
+        return server
+
+    def _get(self) -> smtplib.SMTP:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and time.monotonic() - self._local.opened_at < self.max_age:
+            return conn
+        self.close()
+        return self._connect()
+
+    def close(self):
+        """Close this thread's connection, if any"""
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def sendmail(self, from_addr: str, to_addrs: list, msg: str):
+        try:
+            self._get().sendmail(from_addr, to_addrs, msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server dropped an idle connection; reconnect once
+            self.close()
+            self._get().sendmail(from_addr, to_addrs, msg)
+
+SMTP_POOL = SMTPPool()
+
 def send_email_smtp(to_email: str, subject: str, body: str):
     """Send email using SMTP configuration"""
     if not (Config.SMTP_HOST and Config.SMTP_USER and Config.SMTP_PASS):
@@ -15,10 +62,7 @@ def send_email_smtp(to_email: str, subject: str, body: str):
         msg["From"] = Config.SMTP_FROM
         msg["To"] = to_email
         
-        with smtplib.SMTP(Config.SMTP_HOST, Config.SMTP_PORT) as server:
-            server.starttls()
-            server.login(Config.SMTP_USER, Config.SMTP_PASS)
-            server.sendmail(Config.SMTP_FROM, [to_email], msg.as_string())
+        SMTP_POOL.sendmail(Config.SMTP_FROM, [to_email], msg.as_string())
         
         logging.info(f"Email sent successfully to {to_email}")
         return True
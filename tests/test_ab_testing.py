@@ -0,0 +1,278 @@
+"""
+Tests for A/B Testing Module
+"""
+
+import gc
+import threading
+import weakref
+
+import pytest
+import ab_testing
+from ab_testing import (
+    ABTestingManager, ExperimentStatus, ExperimentType,
+    chi_squared_contingency, chi_squared_p_value
+)
+
+
+def _create(manager, **kwargs):
+    return manager.create_experiment(
+        name="Subject line test",
+        description="Short vs long subject",
+        experiment_type=ExperimentType.EMAIL_SUBJECT,
+        variant_names=["Control", "Variant A"],
+        variant_descriptions=["Short", "Long"],
+        **kwargs
+    )
+
+
+class TestABTestingManager:
+    """Test experiment storage and event recording"""
+
+    def test_create_and_get(self, tmp_path):
+        """Test created experiments can be fetched"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        fetched = manager.get_experiment(experiment.id)
+        assert fetched.name == "Subject line test"
+        assert fetched.description == "Short vs long subject"
+        assert [v.id for v in fetched.variants] == ["variant_0", "variant_1"]
+
+    def test_invalid_traffic_allocation(self, tmp_path):
+        """Test traffic allocation must sum to 1.0"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+
+        with pytest.raises(ValueError):
+            _create(manager, traffic_allocation=[0.5, 0.6])
+
+    def test_missing_experiment(self, tmp_path):
+        """Test unknown experiment IDs raise ValueError"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+
+        with pytest.raises(ValueError):
+            manager.get_experiment("missing")
+
+    def test_record_events(self, tmp_path):
+        """Test impressions and conversions update variant metrics"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        for _ in range(4):
+            manager.record_impression(experiment.id, "variant_0")
+        manager.record_conversion(experiment.id, "variant_0", revenue=10.0)
+        manager.record_impression(experiment.id, "unknown_variant")
+
+        variant = manager.get_experiment(experiment.id).variants[0]
+        assert variant.impressions == 4
+        assert variant.conversions == 1
+        assert variant.conversion_rate == pytest.approx(25.0)
+        assert variant.revenue_per_visitor == pytest.approx(2.5)
+
+    def test_revenue_variance(self, tmp_path):
+        """Test running revenue statistics match a two-pass calculation"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+        amounts = [10.0, 12.5, 7.0, 30.0]
+
+        for amount in amounts:
+            manager.record_impression(experiment.id, "variant_0")
+            manager.record_conversion(experiment.id, "variant_0", revenue=amount)
+
+        variant = manager.get_experiment(experiment.id).variants[0]
+        mean = sum(amounts) / len(amounts)
+        variance = sum((a - mean) ** 2 for a in amounts) / (len(amounts) - 1)
+        assert variant.revenue_mean == pytest.approx(mean)
+        assert variant.revenue_variance == pytest.approx(variance)
+
+    def test_flush_persists_counters(self, tmp_path):
+        """Test buffered counters reach storage on flush"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        manager.record_impression(experiment.id, "variant_1")
+        manager.record_conversion(experiment.id, "variant_1", revenue=5.0)
+        manager.flush()
+
+        reloaded = ABTestingManager(storage_path=str(tmp_path)).get_experiment(experiment.id)
+        assert reloaded.variants[1].impressions == 1
+        assert reloaded.variants[1].conversions == 1
+        assert reloaded.variants[1].revenue == pytest.approx(5.0)
+
+    def test_close_flushes_and_releases_manager(self, tmp_path):
+        """Test closed or discarded managers are not kept alive for the exit hook"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+        manager.record_impression(experiment.id, "variant_0")
+        manager.close()
+
+        assert manager not in ab_testing._managers
+        reloaded = ABTestingManager(storage_path=str(tmp_path))
+        assert reloaded.get_experiment(experiment.id).variants[0].impressions == 1
+
+        ref = weakref.ref(reloaded)
+        del reloaded
+        gc.collect()
+        assert ref() is None
+
+    def test_snapshot_after_flush_does_not_double_count(self, tmp_path):
+        """Test logged events are not replayed on top of a newer snapshot"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        manager.record_impression(experiment.id, "variant_0")
+        manager.flush()
+        manager.start_experiment(experiment.id)
+        manager.record_impression(experiment.id, "variant_0")
+        manager.flush()
+
+        reloaded = ABTestingManager(storage_path=str(tmp_path)).get_experiment(experiment.id)
+        assert reloaded.variants[0].impressions == 2
+
+    def test_log_compaction(self, tmp_path, monkeypatch):
+        """Test the event log is folded into the snapshot once it grows"""
+        monkeypatch.setattr(ab_testing, "LOG_COMPACT_BYTES", 64)
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        for _ in range(10):
+            manager.record_impression(experiment.id, "variant_1")
+        manager.record_conversion(experiment.id, "variant_1", revenue=3.0)
+        manager.flush()
+
+        assert (tmp_path / f"{experiment.id}.log").stat().st_size == 0
+        reloaded = ABTestingManager(storage_path=str(tmp_path)).get_experiment(experiment.id)
+        assert reloaded.variants[1].impressions == 10
+        assert reloaded.variants[1].revenue == pytest.approx(3.0)
+
+    def test_crash_during_compaction_keeps_later_events(self, tmp_path, monkeypatch):
+        """Test events logged after an interrupted compaction are not skipped"""
+        monkeypatch.setattr(ab_testing, "LOG_COMPACT_BYTES", 64)
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        # Die between truncating the log and recording offset 0
+        write_snapshot = ABTestingManager._write_snapshot
+        def crash_on_reset(self, experiment_id, data, log_offset):
+            if log_offset == 0 and (tmp_path / f"{experiment_id}.log").stat().st_size == 0:
+                raise SystemExit("crash")
+            write_snapshot(self, experiment_id, data, log_offset)
+        monkeypatch.setattr(ABTestingManager, "_write_snapshot", crash_on_reset)
+        for _ in range(10):
+            manager.record_impression(experiment.id, "variant_0")
+        with pytest.raises(SystemExit):
+            manager.flush()
+        monkeypatch.setattr(ABTestingManager, "_write_snapshot", write_snapshot)
+
+        restarted = ABTestingManager(storage_path=str(tmp_path))
+        assert restarted.get_experiment(experiment.id).variants[0].impressions == 10
+        for _ in range(3):
+            restarted.record_impression(experiment.id, "variant_1")
+        restarted.flush()
+
+        reloaded = ABTestingManager(storage_path=str(tmp_path)).get_experiment(experiment.id)
+        assert reloaded.variants[0].impressions == 10
+        assert reloaded.variants[1].impressions == 3
+
+    def test_concurrent_events_are_not_lost(self, tmp_path):
+        """Test events recorded from several threads all reach storage"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager)
+
+        def record():
+            for _ in range(500):
+                manager.record_impression(experiment.id, "variant_0")
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        manager.flush()
+
+        reloaded = ABTestingManager(storage_path=str(tmp_path)).get_experiment(experiment.id)
+        assert reloaded.variants[0].impressions == 2000
+
+    def test_get_results_refreshes_after_events(self, tmp_path):
+        """Test cached results are rebuilt once counters change"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = _create(manager, minimum_sample_size=1)
+
+        first = manager.get_results(experiment.id)
+        assert manager.get_results(experiment.id) is first
+        assert first["sample_size_met"] is False
+
+        manager.record_impression(experiment.id, "variant_0")
+        manager.record_impression(experiment.id, "variant_1")
+
+        second = manager.get_results(experiment.id)
+        assert second is not first
+        assert second["sample_size_met"] is True
+
+    def test_winner_considers_every_variant(self, tmp_path):
+        """Test the winner can be any variant, not just the first two"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        experiment = manager.create_experiment(
+            name="CTA colour",
+            description="Three button colours",
+            experiment_type=ExperimentType.CTA_BUTTON,
+            variant_names=["Control", "Green", "Orange"],
+            variant_descriptions=["Blue", "Green", "Orange"],
+            minimum_sample_size=100
+        )
+
+        for variant_id, conversions in [("variant_0", 10), ("variant_1", 12), ("variant_2", 30)]:
+            for _ in range(100):
+                manager.record_impression(experiment.id, variant_id)
+            for _ in range(conversions):
+                manager.record_conversion(experiment.id, variant_id)
+
+        results = manager.get_results(experiment.id)
+        assert results["winner"] == "variant_2"
+        assert results["is_significant"] is True
+
+    def test_list_experiments_filters_by_status(self, tmp_path):
+        """Test listing experiments by status"""
+        manager = ABTestingManager(storage_path=str(tmp_path))
+        draft = _create(manager)
+        running = _create(manager)
+        manager.start_experiment(running.id)
+
+        assert {e.id for e in manager.list_experiments()} == {draft.id, running.id}
+        assert [e.id for e in manager.list_experiments(status=ExperimentStatus.RUNNING)] == [running.id]
+        assert [e.id for e in manager.list_experiments(status=ExperimentStatus.DRAFT)] == [draft.id]
+
+        manager.pause_experiment(running.id)
+        added = _create(manager)
+        assert {e.id for e in manager.list_experiments()} == {draft.id, running.id, added.id}
+        assert [e.id for e in manager.list_experiments(status=ExperimentStatus.PAUSED)] == [running.id]
+
+
+
+class TestChiSquared:
+    """Test chi-squared significance helpers"""
+
+    @pytest.mark.parametrize("chi_squared,df", [
+        (3.841, 1), (6.635, 1), (5.991, 2), (7.815, 3), (18.307, 10)
+    ])
+    def test_p_value_matches_critical_values(self, chi_squared, df):
+        """Test p-values at tabulated critical values"""
+        expected = 0.01 if chi_squared == 6.635 else 0.05
+        assert chi_squared_p_value(chi_squared, df) == pytest.approx(expected, abs=1e-4)
+
+    def test_contingency_matches_two_variant_test(self):
+        """Test the K x 2 statistic for a 2 x 2 table"""
+        chi_squared, p_value = chi_squared_contingency(((10, 100), (20, 100)))
+        assert chi_squared == pytest.approx(3.9216, abs=1e-4)
+        assert p_value == pytest.approx(0.0477, abs=1e-4)
+
+    def test_contingency_needs_impressions(self):
+        """Test variants without impressions give no result"""
+        assert chi_squared_contingency(((0, 0), (5, 50))) == (None, None)
+
+    def test_p_value_of_zero_statistic(self):
+        """Test a zero statistic is never significant"""
+        assert chi_squared_p_value(0.0, 1) == 1.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -2,8 +2,11 @@
 Tests for AI Service Module
 """
 
+import asyncio
+
 import pytest
-from ai_service import AIContentGenerator, get_ai_generator
+from ai_service import AIContentGenerator, GeneratedPost, SemanticCache, get_ai_generator
+from ai_service import _PostsStreamParser
 
 
 class TestAIContentGenerator:
@@ -56,6 +59,92 @@ class TestAIContentGenerator:
             assert len(posts) == 2
             assert all(post.platform == platform for post in posts)
 
+    def test_generate_social_posts_rejects_unsupported_values(self):
+        """Test unknown platforms and tones are rejected"""
+        generator = AIContentGenerator()
+
+        with pytest.raises(ValueError):
+            generator.generate_social_posts(
+                topic="Test topic",
+                niche="Tech & SaaS",
+                platform="MySpace",
+                tone="Casual"
+            )
+
+        with pytest.raises(ValueError):
+            generator.generate_social_posts(
+                topic="Test topic",
+                niche="Tech & SaaS",
+                platform="Twitter",
+                tone="Sarcastic"
+            )
+
+    def test_generate_social_posts_many(self):
+        """Test concurrent generation returns one result per job, in order"""
+        generator = AIContentGenerator()
+
+        results = asyncio.run(generator.generate_social_posts_many([
+            dict(topic="Spring sale", niche="E-commerce", platform="Instagram",
+                 tone="Casual", num_variations=2),
+            dict(topic="Hiring", niche="Tech & SaaS", platform="LinkedIn",
+                 tone="Professional", num_variations=3),
+        ], max_concurrency=1))
+
+        assert [len(posts) for posts in results] == [2, 3]
+        assert all(post.platform == "Instagram" for post in results[0])
+        assert all(post.platform == "LinkedIn" for post in results[1])
+
+    def test_generate_social_posts_stream(self):
+        """Test streamed generation yields each post in order"""
+        generator = AIContentGenerator()
+
+        async def collect():
+            return [post async for post in generator.generate_social_posts_stream(
+                topic="Spring sale", niche="E-commerce", platform="TikTok",
+                tone="Funny", num_variations=2
+            )]
+
+        posts = asyncio.run(collect())
+
+        assert [post.variation_number for post in posts] == [1, 2]
+        assert all(post.platform == "TikTok" for post in posts)
+
+    def test_stream_is_closed_inside_the_client_on_early_exit(self, monkeypatch):
+        """Test stopping after enough posts closes the stream before the client"""
+        generator = AIContentGenerator()
+        events = []
+
+        class Client:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                events.append("client closed")
+
+        async def stream_text(client, provider, prompt):
+            try:
+                yield '{"posts": [{"caption": "One", "hashtags": []}, '
+                yield '{"caption": "Two", "hashtags": []}]}'
+            finally:
+                events.append("stream closed")
+
+        monkeypatch.setattr(generator, "_select_provider", lambda: "openai")
+        monkeypatch.setattr(generator.post_cache, "get", lambda *args: None)
+        monkeypatch.setattr(generator.post_cache, "set", lambda *args: None)
+        monkeypatch.setattr(generator, "_async_client", lambda provider: Client())
+        monkeypatch.setattr(generator, "_stream_text", stream_text)
+
+        async def collect():
+            return [post async for post in generator.generate_social_posts_stream(
+                topic="Spring sale", niche="E-commerce", platform="TikTok",
+                tone="Funny", num_variations=1
+            )]
+
+        posts = asyncio.run(collect())
+
+        assert [post.caption for post in posts] == ["One"]
+        assert events == ["stream closed", "client closed"]
+
     def test_generate_email_content(self):
         """Test email content generation"""
         generator = AIContentGenerator()
@@ -91,6 +180,52 @@ class TestAIContentGenerator:
         assert "Tech & SaaS" in prompt
 
 
+class TestPostsStreamParser:
+    """Test incremental parsing of streamed responses"""
+
+    def test_items_are_returned_as_they_complete(self):
+        """Test each post is available once its closing brace arrives"""
+        response = '```json\n{"posts": [{"caption": "One {x}", "hashtags": ["#a"]}, {"caption": "Two", "hashtags": []}]}\n```'
+        parser = _PostsStreamParser()
+
+        seen = []
+        for i in range(0, len(response), 7):
+            seen.append(parser.feed(response[i:i + 7]))
+
+        items = [item for batch in seen for item in batch]
+        assert [item["caption"] for item in items] == ["One {x}", "Two"]
+        assert sum(1 for batch in seen if batch) == 2
+
+
+class TestSemanticCache:
+    """Test the generated post cache"""
+
+    def test_normalized_repeat_is_served(self):
+        """Test a repeat differing only in case and punctuation hits the cache"""
+        cache = SemanticCache()
+        posts = [GeneratedPost(caption="Big news", hashtags=["#Launch"],
+                               platform="Twitter", variation_number=1)]
+
+        cache.set("Launching our app", "Tech & SaaS", "Twitter", "Casual", 1, posts)
+
+        assert cache.get("  launching our APP! ", "Tech & SaaS", "Twitter", "Casual", 1) == posts
+        assert cache.get("Launching our app", "Tech & SaaS", "Twitter", "Funny", 1) is None
+        assert cache.get("Launching our app", "Tech & SaaS", "Twitter", "Casual", 2) is None
+
+    def test_inner_punctuation_is_significant(self):
+        """Test topics differing in symbols such as % or + do not share an entry"""
+        cache = SemanticCache()
+        posts = [GeneratedPost(caption="Sale", hashtags=["#Deals"],
+                               platform="Instagram", variation_number=1)]
+
+        cache.set("50% off everything", "E-commerce", "Instagram", "Casual", 1, posts)
+        cache.set("C++ tips", "Tech & SaaS", "Instagram", "Casual", 1, posts)
+
+        assert cache.get("50 off everything", "E-commerce", "Instagram", "Casual", 1) is None
+        assert cache.get("$50 off everything", "E-commerce", "Instagram", "Casual", 1) is None
+        assert cache.get("C tips", "Tech & SaaS", "Instagram", "Casual", 1) is None
+
+
 class TestGlobalAIGenerator:
     """Test global AI generator instance"""
 
@@ -0,0 +1,243 @@
+"""
+Tests for the Flask app's webhook and background jobs
+"""
+
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+
+import pytest
+
+# Config reads DATABASE_URL at import; point it at a scratch SQLite file
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+import app as app_module
+from app import app, utcnow, schedule_next_reminder, log_action, _flush_audit_log, REMINDER_JOB_ID
+from database import db
+from models import Tenant, Booking, AuditLog, ReminderLog
+
+
+@pytest.fixture
+def tenant_id():
+    """A tenant with default notification settings, and a paused scheduler"""
+    with app.app_context():
+        db.create_all()
+        tenant = Tenant(name="Reminder test")  # type: ignore
+        db.session.add(tenant)
+        db.session.commit()
+        tenant_id = tenant.id
+
+    scheduler = app_module.scheduler
+    scheduler.pause()
+    if scheduler.get_job(REMINDER_JOB_ID):
+        scheduler.remove_job(REMINDER_JOB_ID)
+
+    with app.app_context():
+        yield tenant_id
+
+        if scheduler.get_job(REMINDER_JOB_ID):
+            scheduler.remove_job(REMINDER_JOB_ID)
+        scheduler.resume()
+        ReminderLog.query.filter_by(tenant_id=tenant_id).delete()
+        Booking.query.filter_by(tenant_id=tenant_id).delete()
+        Tenant.query.filter_by(id=tenant_id).delete()
+        db.session.commit()
+
+
+def _book(tenant_id, start_at, email="customer@example.com"):
+    db.session.add(Booking(id=uuid.uuid4().hex[:12], tenant_id=tenant_id,  # type: ignore
+                           customer_email=email, start_at=start_at,
+                           status="confirmed"))
+    db.session.commit()
+
+
+def _next_run():
+    job = app_module.scheduler.get_job(REMINDER_JOB_ID)
+    return job.next_run_time.replace(tzinfo=None) if job else None
+
+
+class TestReminderScheduling:
+    """Test the one-shot booking reminder job is never lost"""
+
+    def test_recompute_includes_reminders_due_within_the_window(self, tenant_id):
+        """Test startup and settings changes schedule reminders that are nearly due"""
+        now = utcnow()
+        _book(tenant_id, now + timedelta(hours=24, minutes=2))
+
+        schedule_next_reminder()
+
+        assert _next_run() <= now + timedelta(minutes=2, seconds=1)
+
+    def test_recompute_runs_overdue_reminders_now(self, tenant_id):
+        """Test a reminder whose send time just passed is sent right away"""
+        _book(tenant_id, utcnow() + timedelta(hours=24, minutes=-2))
+
+        schedule_next_reminder()
+
+        assert _next_run() <= utcnow() + timedelta(seconds=1)
+
+    def test_recompute_keeps_an_earlier_job(self, tenant_id):
+        """Test a plain recompute never drops or delays a pending run"""
+        start_at = utcnow() + timedelta(hours=24, minutes=2)
+        _book(tenant_id, start_at)
+        schedule_next_reminder(start_at - timedelta(hours=24))
+        scheduled = _next_run()
+
+        schedule_next_reminder()
+        assert _next_run() == scheduled
+
+        schedule_next_reminder(run_started=utcnow())
+        assert _next_run() == scheduled
+
+    def test_booking_created_during_a_run_is_reminded(self, tenant_id, monkeypatch):
+        """Test a run that starts while another is sending makes that one scan again"""
+        _book(tenant_id, utcnow() + timedelta(hours=24), email="first@example.com")
+        sent = []
+
+        def send_email(to, subject, body):
+            sent.append(to)
+            if to == "first@example.com":
+                # A new booking arrives mid-run and its job fires immediately
+                with app.app_context():
+                    _book(tenant_id, utcnow() + timedelta(hours=24, minutes=1),
+                          email="second@example.com")
+                app_module._send_booking_reminders()
+                sent.append("second run returned")
+            return True
+        monkeypatch.setattr(app_module, "send_email_smtp", send_email)
+
+        app_module._send_booking_reminders()
+
+        # The second run only flags a rescan; the running one sends it
+        assert sent == ["first@example.com", "second run returned", "second@example.com"]
+        assert ReminderLog.query.filter_by(tenant_id=tenant_id).count() == 2
+
+
+class TestListBookings:
+    """Test polling the booking list revalidates cheaply"""
+
+    def test_unchanged_list_answers_304_without_loading_rows(self, tenant_id, monkeypatch):
+        """Test a matching If-None-Match short-circuits before the rows query"""
+        _book(tenant_id, utcnow() + timedelta(hours=2))
+        client = app.test_client()
+        url = f"/api/tenants/{tenant_id}/bookings"
+
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        assert first.status_code == 200 and len(first.get_json()) == 1
+
+        statements = []
+        execute = db.session.execute
+        def record(statement, *args, **kwargs):
+            statements.append(statement)
+            return execute(statement, *args, **kwargs)
+        monkeypatch.setattr(db.session, "execute", record)
+
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        assert cached.data == b""
+        assert not any("customer_name" in str(stmt) for stmt in statements)
+
+        _book(tenant_id, utcnow() + timedelta(hours=3))
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert len(changed.get_json()) == 2
+
+
+class TestStripeWebhook:
+    """Test webhook events are only acknowledged once applied"""
+
+    @pytest.fixture
+    def deliver(self, monkeypatch):
+        event = {"id": "evt_test", "type": "checkout.session.completed",
+                 "data": {"object": {"id": "cs_test", "metadata": {}}}}
+        monkeypatch.setattr(app_module.stripe.Webhook, "construct_event",
+                            lambda payload, sig, secret: event)
+        client = app.test_client()
+        return lambda: client.post("/webhook", data="{}", headers={"Stripe-Signature": "t=1"})
+
+    def test_applied_event_is_acknowledged(self, deliver, monkeypatch):
+        """Test a processed event answers 200"""
+        applied = []
+        monkeypatch.setattr(app_module, "_apply_checkout_session", applied.append)
+
+        assert deliver().status_code == 200
+        assert [s["id"] for s in applied] == ["cs_test"]
+
+    def test_failed_event_asks_stripe_to_retry(self, deliver, monkeypatch):
+        """Test a processing error answers 5xx so Stripe redelivers"""
+        def fail(session_data):
+            raise RuntimeError("database unavailable")
+        monkeypatch.setattr(app_module, "_apply_checkout_session", fail)
+
+        assert deliver().status_code == 500
+
+
+class TestCheckoutUpgrade:
+    """Test only paid Checkout Sessions change a tenant's plan"""
+
+    @pytest.mark.parametrize("status,payment_status,plan", [
+        ("complete", "paid", "flowkit"),
+        ("complete", "no_payment_required", "flowkit"),
+        ("complete", "unpaid", "starter"),
+        ("open", "unpaid", "starter"),
+        ("expired", "unpaid", "starter"),
+    ])
+    def test_plan_follows_payment_status(self, tenant_id, status, payment_status, plan):
+        """Test abandoned or unpaid sessions leave the plan alone"""
+        app_module._apply_checkout_session({
+            "id": "cs_test", "status": status, "payment_status": payment_status,
+            "metadata": {"tenant_id": tenant_id, "plan": "flowkit"}
+        })
+
+        db.session.expire_all()
+        assert db.session.get(Tenant, tenant_id).plan == plan
+
+
+class TestRunInBackground:
+    """Test one-shot jobs always run"""
+
+    def test_runs_inline_without_a_running_scheduler(self, monkeypatch):
+        """Test jobs are not parked on a scheduler that will never run them"""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        monkeypatch.setattr(app_module, "scheduler", BackgroundScheduler())
+        ran = []
+
+        app_module.run_in_background(ran.append, "job")
+
+        assert ran == ["job"]
+
+
+class TestAuditFlush:
+    """Test queued audit rows survive a failed flush"""
+
+    def test_failed_batch_is_retried(self, monkeypatch):
+        """Test rows from a failed insert are written by the next flush"""
+        with app.app_context():
+            db.create_all()
+        scheduler = app_module.scheduler
+        scheduler.pause()
+        try:
+            log_action("tenant_audit", "user_1", "retry_test", "tenant", "tenant_audit")
+
+            execute = db.session.execute
+            def fail(*args, **kwargs):
+                raise RuntimeError("database unavailable")
+            monkeypatch.setattr(db.session, "execute", fail)
+            _flush_audit_log()
+            assert len(app_module._audit_retry) == 1
+
+            monkeypatch.setattr(db.session, "execute", execute)
+            _flush_audit_log()
+            assert app_module._audit_retry == []
+            with app.app_context():
+                assert AuditLog.query.filter_by(action="retry_test").count() == 1
+        finally:
+            scheduler.resume()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
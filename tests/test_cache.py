@@ -2,8 +2,13 @@
 Tests for Cache Module
 """
 
+import pickle
+import time
+from datetime import datetime
+
 import pytest
 from cache import Cache, get_cache, cached, cache_clear, CachePatterns
+from cache import _serialize, _deserialize, _args_digest, _MemoryCache
 
 
 class TestCache:
@@ -113,6 +118,55 @@ class TestCache:
         assert retrieved['tuple'] == (4, 5, 6)
 
 
+class TestMemoryCache:
+    """Test the in-memory fallback store"""
+
+    def test_expire_is_honoured(self, monkeypatch):
+        """Test entries disappear once their expiry passes"""
+        store = _MemoryCache()
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        store.set("short", "value", expire=10)
+        store.set("forever", "value")
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert store.get("short") is None
+        assert "short" not in store
+        assert store.get("forever") == "value"
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the store stays within maxsize, dropping the oldest unused key"""
+        store = _MemoryCache(maxsize=2)
+        store.set("a", 1)
+        store.set("b", 2)
+        store.get("a")
+        store.set("c", 3)
+
+        assert len(store) == 2
+        assert "b" not in store
+        assert store.get("a") == 1
+        assert store.get("c") == 3
+
+
+class TestSerialization:
+    """Test the Redis value encoding"""
+
+    @pytest.mark.parametrize("value", [
+        "text", 42, 1.5, True, None,
+        {"posts": [{"caption": "Hi", "hashtags": ["#a"]}], "count": 1},
+        {"tuple": (4, 5, 6)},
+        {"created_at": datetime(2024, 1, 2, 3, 4, 5)},
+        {1: "int key"},
+    ])
+    def test_round_trip(self, value):
+        """Test values come back with the same types"""
+        assert _deserialize(_serialize(value)) == value
+
+    def test_legacy_pickle_entries(self):
+        """Test untagged pickles written before the format tag still decode"""
+        assert _deserialize(pickle.dumps({"legacy": (1, 2)})) == {"legacy": (1, 2)}
+
+
 class TestCachedDecorator:
     """Test @cached decorator"""
 
@@ -140,6 +194,24 @@ class TestCachedDecorator:
         assert result3 == 20
         assert call_count[0] == 2
 
+    def test_cached_decorator_distinguishes_kwargs(self):
+        """Test keyword arguments are part of the cache key"""
+        @cached(expire=60)
+        def greet(name, greeting="Hello"):
+            return f"{greeting} {name}"
+
+        assert greet("Ada") == "Hello Ada"
+        assert greet("Ada", greeting="Hi") == "Hi Ada"
+        assert greet("Ada", greeting="Hello") == "Hello Ada"
+
+    def test_args_digest_is_fixed_width(self):
+        """Test large arguments produce short, stable keys"""
+        prompt = "word " * 10000
+
+        assert len(_args_digest((prompt,), {})) == 32
+        assert _args_digest((prompt,), {"tone": "Casual"}) == _args_digest((prompt,), {"tone": "Casual"})
+        assert _args_digest((prompt,), {"tone": "Casual"}) != _args_digest((prompt,), {"tone": "Funny"})
+
     def test_cached_decorator_with_key_prefix(self):
         """Test cached decorator with key prefix"""
         @cached(expire=60, key_prefix='user')